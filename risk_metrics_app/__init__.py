@@ -1,3 +1,11 @@
-from .app import run_app
-
 __all__ = ["run_app"]
+
+
+def __getattr__(name):
+    # run_app is imported on first access so that importing a submodule on its
+    # own (e.g. reporting, in the PNG export workers) does not load Streamlit
+    if name == "run_app":
+        from .app import run_app
+
+        return run_app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
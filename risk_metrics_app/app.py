@@ -5,12 +5,13 @@ from typing import Any, Dict, List, Optional
 import pandas as pd
 import streamlit as st
 
-from .config import logger, MAX_EXCLUSION_KEYWORDS, OUTPUT_DIR
+from .config import logger, LLM_PROMPT_MODE, MAX_EXCLUSION_KEYWORDS, OUTPUT_DIR
 from .llm import LLMRequest, get_portfolio_summary, process_llm_requests, run_async_task
 from .metrics import (
     LIMIT_MAX_SUFFIX,
     LIMIT_MIN_SUFFIX,
     VALUE_DATE_COLUMN,
+    build_limit_arrays,
     calculate_statistics,
     check_limit_breaches,
     detect_node_column,
@@ -21,7 +22,7 @@ from .metrics import (
     parse_exclusion_keywords,
     split_by_node,
 )
-from .prompts import create_llm_prompt
+from .prompts import SINGLE_METRIC_SYSTEM_PROMPT, create_llm_prompt, format_stats
 from .reporting import create_batch_export_package, create_export_package, create_html_report, sanitize_node_name
 from .dataset import build_long_dataset, write_long_dataset_csv
 from .visuals import (
@@ -47,6 +48,7 @@ def initialize_session_state() -> None:
     st.session_state.setdefault("uploaded_file_name", None)
     st.session_state.setdefault("use_llm", True)
     st.session_state.setdefault("analysis_use_llm", None)
+    st.session_state.setdefault("refresh_llm_cache", False)  # Bypass cached LLM responses on the next run
     st.session_state.setdefault("extraction_result", None)
     st.session_state.setdefault("extraction_username", "")
     st.session_state.setdefault("extraction_perimeter_raw", "")
@@ -64,6 +66,7 @@ def initialize_session_state() -> None:
     st.session_state.setdefault("scale_contexts", {})  # Dict[str, ScaleContext] - metric -> context
     st.session_state.setdefault("adaptive_scale_toggles", {})  # Dict[str, bool] - metric -> enabled
     st.session_state.setdefault("use_adaptive_scaling", True)  # Global adaptive scaling toggle
+    st.session_state.setdefault("include_png_charts", False)  # Render chart PNGs into ZIP exports
     
     # Metric exclusion filter state
     st.session_state.setdefault("exclusion_keywords_raw", "")
@@ -147,6 +150,12 @@ def render_sidebar() -> tuple[Optional[str], Optional[Any], bool, bool, bool, bo
 
             if api_key:
                 os.environ["GOOGLE_API_KEY"] = api_key
+
+            st.session_state.refresh_llm_cache = st.checkbox(
+                "Regenerate AI insights",
+                value=st.session_state.get("refresh_llm_cache", False),
+                help="Ignore cached responses and request fresh commentary for the same data.",
+            )
         else:
             st.info("AI insights disabled. Only statistics and charts will be generated.")
 
@@ -166,6 +175,12 @@ def render_sidebar() -> tuple[Optional[str], Optional[Any], bool, bool, bool, bo
         )
         st.session_state.use_adaptive_scaling = use_adaptive_scaling
 
+        st.session_state.include_png_charts = st.checkbox(
+            "Include PNG charts in ZIP exports",
+            value=st.session_state.get("include_png_charts", False),
+            help="Render every chart to a PNG image in the ZIP packages. Slower; the HTML report already contains interactive charts.",
+        )
+
         st.divider()
 
         # Metric exclusion filter
@@ -330,6 +345,8 @@ def _render_single_export_options(use_llm: bool) -> None:
             excluded_by_keyword=st.session_state.get("excluded_by_keyword", []),
             excluded_by_limit=st.session_state.get("excluded_by_limit", []),
             long_dataset_csv=long_dataset_csv,
+            html_content=html_report,
+            include_png_charts=st.session_state.get("include_png_charts", False),
         )
         st.download_button(
             label="📦 Download Complete Package (ZIP)",
@@ -422,6 +439,7 @@ def _render_batch_export_options(use_llm: bool) -> None:
             excluded_by_keyword=st.session_state.get("excluded_by_keyword", []),
             excluded_by_limit=st.session_state.get("excluded_by_limit", []),
             long_dataset_csv=long_dataset_csv,
+            include_png_charts=st.session_state.get("include_png_charts", False),
         )
         st.download_button(
             label="📦 Download All Nodes (ZIP)",
@@ -712,29 +730,27 @@ def _process_node_analysis(
 
     metrics_analyses: List[dict] = []
     llm_requests: list[LLMRequest] = []
+    limit_arrays = build_limit_arrays(df)
+    date_vals = df[VALUE_DATE_COLUMN].to_numpy()
 
     for idx, metric in enumerate(ordered_metrics):
         logger.info("Node %s: Processing metric %s (%s/%s)", node_name, metric, idx + 1, len(ordered_metrics))
         st.subheader(f"📊 {metric}")
 
-        max_limit_col = f"{metric}{LIMIT_MAX_SUFFIX}"
-        min_limit_col = f"{metric}{LIMIT_MIN_SUFFIX}"
-        max_limit = df[max_limit_col] if max_limit_col in df.columns else None
-        min_limit = df[min_limit_col] if min_limit_col in df.columns else None
-
-        # Forward-fill limits to handle missing days (assumes limit unchanged if not specified)
-        if max_limit is not None:
-            max_limit = max_limit.ffill()
-        if min_limit is not None:
-            min_limit = min_limit.ffill()
+        # Limits come forward-filled from limit_arrays; the chart and scale
+        # context take them as Series aligned with df
+        max_arr, min_arr = limit_arrays.get(metric, (None, None))
+        max_limit = pd.Series(max_arr, index=df.index) if max_arr is not None else None
+        min_limit = pd.Series(min_arr, index=df.index) if min_arr is not None else None
 
         metric_series = df[metric]
         stats, outliers = calculate_statistics(metric_series)
-        breaches = check_limit_breaches(df, metric, max_limit, min_limit)
+        stats_fmt = format_stats(stats)
+        breaches = check_limit_breaches(df, metric, limit_arrays=limit_arrays)
 
         # Calculate scale context for adaptive scaling
         scale_context = calculate_scale_context(
-            metric_series, df[VALUE_DATE_COLUMN], max_limit, min_limit
+            metric_series, df[VALUE_DATE_COLUMN], max_limit, min_limit, date_vals=date_vals
         )
         
         # Use global adaptive scaling setting from sidebar
@@ -749,15 +765,15 @@ def _process_node_analysis(
 
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Mean", f"{stats['mean']:.4f}")
+            st.metric("Mean", stats_fmt["mean"])
         with col2:
-            st.metric("Median", f"{stats['median']:.4f}")
+            st.metric("Median", stats_fmt["median"])
         with col3:
-            st.metric("Std Dev", f"{stats['std']:.4f}")
+            st.metric("Std Dev", stats_fmt["std"])
         with col4:
-            st.metric("Min", f"{stats['min']:.4f}")
+            st.metric("Min", stats_fmt["min"])
         with col5:
-            st.metric("Max", f"{stats['max']:.4f}")
+            st.metric("Max", stats_fmt["max"])
 
         outlier_dates = []
         if len(outliers) > 0:
@@ -818,6 +834,7 @@ def _process_node_analysis(
             {
                 "metric": metric,
                 "stats": stats,
+                "fmt": stats_fmt,
                 "outliers": outliers,
                 "outlier_dates": outlier_dates,
                 "breaches": breaches,
@@ -831,11 +848,14 @@ def _process_node_analysis(
 
         if use_llm and should_request_llm and insights_placeholder is not None:
             img_base64 = save_and_encode_image(fig, f"{node_name}_{metric}")
-            prompt_text = create_llm_prompt(metric, stats, outliers, breaches, has_limits)
+            prompt_text = create_llm_prompt(
+                metric, stats, outliers, breaches, has_limits, mode=LLM_PROMPT_MODE, fmt=stats_fmt
+            )
             llm_requests.append(
                 {
                     "metric": metric,
                     "prompt_text": prompt_text,
+                    "system_prompt": SINGLE_METRIC_SYSTEM_PROMPT if LLM_PROMPT_MODE == "compact" else None,
                     "img_base64": img_base64,
                     "placeholder": insights_placeholder,
                     "analysis_index": analysis_index,
@@ -848,12 +868,15 @@ def _process_node_analysis(
     # Process LLM requests for this node
     if use_llm and llm_requests:
         with st.spinner("Generating AI insights..."):
-            llm_results = run_async_task(process_llm_requests(llm_requests))
+            llm_results = run_async_task(
+                process_llm_requests(llm_requests, refresh=st.session_state.get("refresh_llm_cache", False))
+            )
             logger.info("Node %s: Received %s AI insight response(s)", node_name, len(llm_results))
 
-        for request, insight in llm_results:
+        for request, result in llm_results:
             placeholder = request["placeholder"]
-            if insight.startswith("Error generating"):
+            insight = result.content
+            if not result.ok:
                 logger.error("Node %s: AI insight generation failed for %s", node_name, request["metric"])
                 placeholder.error(insight)
             else:
@@ -871,8 +894,11 @@ def _process_node_analysis(
         st.markdown(f"*Comprehensive risk analysis for node {node_name}*")
 
         with st.spinner("Generating portfolio-level risk insights..."):
-            portfolio_summary = get_portfolio_summary(metrics_analyses)
-            if portfolio_summary.startswith("Error generating"):
+            summary_result = get_portfolio_summary(
+                metrics_analyses, refresh=st.session_state.get("refresh_llm_cache", False)
+            )
+            portfolio_summary = summary_result.content
+            if not summary_result.ok:
                 logger.error("Node %s: Portfolio summary generation failed", node_name)
             else:
                 logger.info("Node %s: Portfolio summary generation succeeded", node_name)
@@ -942,29 +968,27 @@ def _handle_single_analysis(
 
     metrics_analyses = []
     llm_requests: list[LLMRequest] = []
+    limit_arrays = build_limit_arrays(df)
+    date_vals = df[VALUE_DATE_COLUMN].to_numpy()
 
     for idx, metric in enumerate(ordered_metrics):
         logger.info("Processing metric %s (%s/%s)", metric, idx + 1, len(ordered_metrics))
         st.header(f"📊 {metric} Analysis")
 
-        max_limit_col = f"{metric}{LIMIT_MAX_SUFFIX}"
-        min_limit_col = f"{metric}{LIMIT_MIN_SUFFIX}"
-        max_limit = df[max_limit_col] if max_limit_col in df.columns else None
-        min_limit = df[min_limit_col] if min_limit_col in df.columns else None
-
-        # Forward-fill limits to handle missing days (assumes limit unchanged if not specified)
-        if max_limit is not None:
-            max_limit = max_limit.ffill()
-        if min_limit is not None:
-            min_limit = min_limit.ffill()
+        # Limits come forward-filled from limit_arrays; the chart and scale
+        # context take them as Series aligned with df
+        max_arr, min_arr = limit_arrays.get(metric, (None, None))
+        max_limit = pd.Series(max_arr, index=df.index) if max_arr is not None else None
+        min_limit = pd.Series(min_arr, index=df.index) if min_arr is not None else None
 
         metric_series = df[metric]
         stats, outliers = calculate_statistics(metric_series)
-        breaches = check_limit_breaches(df, metric, max_limit, min_limit)
+        stats_fmt = format_stats(stats)
+        breaches = check_limit_breaches(df, metric, limit_arrays=limit_arrays)
 
         # Calculate scale context for adaptive scaling
         scale_context = calculate_scale_context(
-            metric_series, df[VALUE_DATE_COLUMN], max_limit, min_limit
+            metric_series, df[VALUE_DATE_COLUMN], max_limit, min_limit, date_vals=date_vals
         )
         
         # Use global adaptive scaling setting from sidebar
@@ -979,15 +1003,15 @@ def _handle_single_analysis(
 
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("Mean", f"{stats['mean']:.4f}")
+            st.metric("Mean", stats_fmt["mean"])
         with col2:
-            st.metric("Median", f"{stats['median']:.4f}")
+            st.metric("Median", stats_fmt["median"])
         with col3:
-            st.metric("Std Dev", f"{stats['std']:.4f}")
+            st.metric("Std Dev", stats_fmt["std"])
         with col4:
-            st.metric("Min", f"{stats['min']:.4f}")
+            st.metric("Min", stats_fmt["min"])
         with col5:
-            st.metric("Max", f"{stats['max']:.4f}")
+            st.metric("Max", stats_fmt["max"])
 
         outlier_dates = []
         if len(outliers) > 0:
@@ -1049,6 +1073,7 @@ def _handle_single_analysis(
             {
                 "metric": metric,
                 "stats": stats,
+                "fmt": stats_fmt,
                 "outliers": outliers,
                 "outlier_dates": outlier_dates,
                 "breaches": breaches,
@@ -1062,11 +1087,14 @@ def _handle_single_analysis(
 
         if use_llm and should_request_llm and insights_placeholder is not None:
             img_base64 = save_and_encode_image(fig, metric)
-            prompt_text = create_llm_prompt(metric, stats, outliers, breaches, has_limits)
+            prompt_text = create_llm_prompt(
+                metric, stats, outliers, breaches, has_limits, mode=LLM_PROMPT_MODE, fmt=stats_fmt
+            )
             llm_requests.append(
                 {
                     "metric": metric,
                     "prompt_text": prompt_text,
+                    "system_prompt": SINGLE_METRIC_SYSTEM_PROMPT if LLM_PROMPT_MODE == "compact" else None,
                     "img_base64": img_base64,
                     "placeholder": insights_placeholder,
                     "analysis_index": analysis_index,
@@ -1078,12 +1106,15 @@ def _handle_single_analysis(
 
     if use_llm and llm_requests:
         with st.spinner("Generating AI insights..."):
-            llm_results = run_async_task(process_llm_requests(llm_requests))
+            llm_results = run_async_task(
+                process_llm_requests(llm_requests, refresh=st.session_state.get("refresh_llm_cache", False))
+            )
             logger.info("Received %s AI insight response(s)", len(llm_results))
 
-        for request, insight in llm_results:
+        for request, result in llm_results:
             placeholder = request["placeholder"]
-            if insight.startswith("Error generating"):
+            insight = result.content
+            if not result.ok:
                 logger.error("AI insight generation failed for %s", request["metric"])
                 placeholder.error(insight)
             else:
@@ -1102,8 +1133,11 @@ def _handle_single_analysis(
         st.markdown("*Comprehensive risk analysis across all metrics*")
 
         with st.spinner("Generating portfolio-level risk insights..."):
-            portfolio_summary = get_portfolio_summary(metrics_analyses)
-            if portfolio_summary.startswith("Error generating"):
+            summary_result = get_portfolio_summary(
+                metrics_analyses, refresh=st.session_state.get("refresh_llm_cache", False)
+            )
+            portfolio_summary = summary_result.content
+            if not summary_result.ok:
                 logger.error("Portfolio summary generation failed")
             else:
                 logger.info("Portfolio summary generation succeeded")
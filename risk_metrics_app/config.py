@@ -5,14 +5,22 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OUTPUT_DIR = os.path.join(os.path.dirname(BASE_DIR), "Output")
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 LOG_FILE = os.path.join(BASE_DIR, "risk_metrics_analysis.log")
+LLM_CACHE_PATH = os.path.join(OUTPUT_DIR, "llm_cache.sqlite3")
+LLM_CACHE_ENABLED = True
+# Cached LLM responses older than this are ignored and regenerated
+LLM_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
 
 MAX_LLM_CONCURRENCY = 4
 MAX_LLM_ATTEMPTS = 3
 LLM_RETRY_DELAY = 2.0
+# "full" sends the whole single-metric prompt per request; "compact" sends the
+# static instructions as a (cacheable) system message and only statistics per metric
+LLM_PROMPT_MODE = "full"
 
 # Batch processing constants
 NODE_COLUMN = "strananodename"  # Case-insensitive detection target (stored lowercase)
 ADAPTIVE_SCALE_THRESHOLD = 0.10  # Apply adaptive scaling when data occupies <10% of range
+MAX_CHART_POINTS = 3000  # Line traces longer than this are LTTB-downsampled in the HTML report
 
 # Exclusion filter settings
 MAX_EXCLUSION_KEYWORDS = 50
@@ -39,11 +47,16 @@ __all__ = [
     "BASE_DIR",
     "OUTPUT_DIR",
     "LOG_FILE",
+    "LLM_CACHE_PATH",
+    "LLM_CACHE_ENABLED",
+    "LLM_CACHE_TTL_SECONDS",
     "MAX_LLM_CONCURRENCY",
     "MAX_LLM_ATTEMPTS",
     "LLM_RETRY_DELAY",
+    "LLM_PROMPT_MODE",
     "NODE_COLUMN",
     "ADAPTIVE_SCALE_THRESHOLD",
+    "MAX_CHART_POINTS",
     "MAX_EXCLUSION_KEYWORDS",
     "logger",
     "setup_logging",
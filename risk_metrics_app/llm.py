@@ -1,39 +1,107 @@
 import asyncio
+import contextlib
+import os
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Coroutine
 
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 
-from .config import LLM_RETRY_DELAY, MAX_LLM_ATTEMPTS, MAX_LLM_CONCURRENCY, logger
+from .config import LLM_CACHE_ENABLED, LLM_RETRY_DELAY, MAX_LLM_ATTEMPTS, MAX_LLM_CONCURRENCY, logger
+from .llm_cache import LLMResponseCache, llm_response_cache
 from .prompts import create_portfolio_summary_prompt
 
 LLMFactory = Callable[[], ChatGoogleGenerativeAI]
 LLMRequest = Dict[str, Any]
 
+LLM_MODEL_NAME = "gemini-flash-lite-latest"
+
+
+@dataclass
+class LLMResult:
+    """Outcome of an LLM call.
+    
+    Attributes:
+        content: The model response, or a readable error message on failure.
+        ok: True when ``content`` is a model response.
+    """
+    content: str
+    ok: bool = True
+
+
+# Long-lived event loop shared by every run_async_task call so the LLM client's
+# HTTP connection pool and the default executor survive between requests. It is
+# started on first use, not at import.
+_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_LOOP_LOCK = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Return the shared background event loop, starting its thread on first call."""
+    global _LOOP
+    with _LOOP_LOCK:
+        if _LOOP is None:
+            loop = asyncio.new_event_loop()
+            try:
+                threading.Thread(target=loop.run_forever, name="llm-event-loop", daemon=True).start()
+            except RuntimeError:
+                loop.close()
+                raise
+            _LOOP = loop
+        return _LOOP
+
+
+async def _cached_response(cache_key: str, refresh: bool) -> Optional[str]:
+    """Look ``cache_key`` up off the event loop; ``refresh`` skips the lookup."""
+    if not LLM_CACHE_ENABLED or refresh:
+        return None
+    return await asyncio.to_thread(llm_response_cache.get, cache_key)
+
+
+async def _store_response(cache_key: str, result: LLMResult) -> None:
+    """Persist a successful response off the event loop."""
+    if LLM_CACHE_ENABLED and result.ok:
+        await asyncio.to_thread(llm_response_cache.put, cache_key, result.content)
+
+
+@lru_cache(maxsize=4)
+def _shared_llm(api_key: str) -> ChatGoogleGenerativeAI:
+    """Return one chat client per API key so its HTTP connection pool is reused."""
+    return ChatGoogleGenerativeAI(model=LLM_MODEL_NAME, temperature=0.7, google_api_key=api_key or None)
+
+
+def default_llm_factory() -> ChatGoogleGenerativeAI:
+    """Return the shared chat client for the currently configured Google API key."""
+    return _shared_llm(os.environ.get("GOOGLE_API_KEY", ""))
+
 
 async def invoke_llm_with_retry(
     message: HumanMessage,
     llm_factory: LLMFactory,
-    semaphore: asyncio.Semaphore,
+    semaphore: Optional[asyncio.Semaphore],
     max_attempts: int = MAX_LLM_ATTEMPTS,
     retry_delay: float = LLM_RETRY_DELAY,
-) -> str:
-    """Invoke the provided LLM with retry logic and concurrency control."""
+    system_prompt: Optional[str] = None,
+) -> LLMResult:
+    """Invoke the provided LLM with retry logic and optional concurrency control."""
     last_error: Optional[Exception] = None
+    messages = [SystemMessage(content=system_prompt), message] if system_prompt else [message]
 
     for attempt in range(1, max_attempts + 1):
         llm = llm_factory()
         try:
             logger.info("LLM request attempt %s", attempt)
-            async with semaphore:
+            async with semaphore if semaphore is not None else contextlib.nullcontext():
                 if hasattr(llm, "ainvoke"):
-                    response = await llm.ainvoke([message])
+                    response = await llm.ainvoke(messages)
                 else:
                     loop = asyncio.get_running_loop()
-                    response = await loop.run_in_executor(None, llm.invoke, [message])
+                    response = await loop.run_in_executor(None, llm.invoke, messages)
             content = response.content
             logger.info("LLM request succeeded on attempt %s", attempt)
-            return content if isinstance(content, str) else str(content)
+            return LLMResult(content if isinstance(content, str) else str(content))
         except Exception as error:  # noqa: BLE001 - broad for retry logic
             last_error = error
             logger.warning("LLM request failed on attempt %s: %s", attempt, error)
@@ -41,7 +109,9 @@ async def invoke_llm_with_retry(
                 await asyncio.sleep(retry_delay)
 
     logger.error("LLM request exhausted retries: %s", last_error)
-    return f"Error generating AI analysis: {str(last_error)}\n\nPlease check your Google API key."
+    return LLMResult(
+        f"Error generating AI analysis: {str(last_error)}\n\nPlease check your Google API key.", ok=False
+    )
 
 
 async def process_llm_requests(
@@ -49,17 +119,28 @@ async def process_llm_requests(
     max_concurrent: int = MAX_LLM_CONCURRENCY,
     max_attempts: int = MAX_LLM_ATTEMPTS,
     retry_delay: float = LLM_RETRY_DELAY,
-) -> List[Tuple[LLMRequest, str]]:
-    """Process multiple LLM requests concurrently with rate limiting and retry."""
+    refresh: bool = False,
+) -> List[Tuple[LLMRequest, LLMResult]]:
+    """Process multiple LLM requests concurrently with rate limiting and retry.
+    
+    With ``refresh`` the response cache is not consulted, but the regenerated
+    responses still replace the cached ones.
+    """
     request_list = list(requests)
     semaphore = asyncio.Semaphore(max_concurrent)
     logger.info("Processing %s LLM request(s) with max concurrency %s", len(request_list), max_concurrent)
 
-    async def handle_request(request: LLMRequest) -> Tuple[LLMRequest, str]:
-        logger.info("Dispatching LLM request for metric %s", request["metric"])
+    async def handle_request(request: LLMRequest) -> Tuple[LLMRequest, LLMResult]:
+        system_prompt = request.get("system_prompt")
+        cache_key = LLMResponseCache.make_key(
+            LLM_MODEL_NAME, system_prompt or "", request["prompt_text"], request["img_base64"]
+        )
+        cached = await _cached_response(cache_key, refresh)
+        if cached is not None:
+            logger.info("Using cached LLM response for metric %s", request["metric"])
+            return request, LLMResult(cached)
 
-        def llm_factory() -> ChatGoogleGenerativeAI:
-            return ChatGoogleGenerativeAI(model="gemini-flash-lite-latest", temperature=0.7)
+        logger.info("Dispatching LLM request for metric %s", request["metric"])
 
         message = HumanMessage(
             content=[
@@ -72,44 +153,65 @@ async def process_llm_requests(
             ]
         )
 
-        content = await invoke_llm_with_retry(
+        result = await invoke_llm_with_retry(
             message,
-            llm_factory,
+            default_llm_factory,
             semaphore,
             max_attempts=max_attempts,
             retry_delay=retry_delay,
+            system_prompt=system_prompt,
         )
-        return request, content
+        await _store_response(cache_key, result)
+        return request, result
 
     tasks = [handle_request(req) for req in request_list]
-    return await asyncio.gather(*tasks)
+    # Keep sibling results when one task fails unexpectedly (e.g. cancellation)
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    llm_response_cache.log_stats()
+
+    paired: List[Tuple[LLMRequest, LLMResult]] = []
+    for request, result in zip(request_list, results):
+        if isinstance(result, BaseException):
+            logger.error("LLM request for metric %s raised: %s", request["metric"], result)
+            paired.append((request, LLMResult(f"Error generating AI analysis: {str(result)}", ok=False)))
+        else:
+            paired.append(result)
+    return paired
 
 
 async def invoke_text_prompt(
     prompt_text: str,
     max_attempts: int = MAX_LLM_ATTEMPTS,
     retry_delay: float = LLM_RETRY_DELAY,
-) -> str:
-    """Invoke the LLM with a text-only prompt and retry handling."""
-    semaphore = asyncio.Semaphore(1)
+    refresh: bool = False,
+) -> LLMResult:
+    """Invoke the LLM with a text-only prompt and retry handling.
+    
+    ``refresh`` bypasses the response cache lookup, as in :func:`process_llm_requests`.
+    """
     logger.info("Invoking text-only LLM prompt")
 
-    message = HumanMessage(content=prompt_text)
+    cache_key = LLMResponseCache.make_key(LLM_MODEL_NAME, prompt_text)
+    cached = await _cached_response(cache_key, refresh)
+    if cached is not None:
+        logger.info("Using cached LLM response for text-only prompt")
+        return LLMResult(cached)
 
-    def llm_factory() -> ChatGoogleGenerativeAI:
-        return ChatGoogleGenerativeAI(model="gemini-flash-lite-latest", temperature=0.7)
+    message = HumanMessage(content=prompt_text)
 
-    return await invoke_llm_with_retry(
+    result = await invoke_llm_with_retry(
         message,
-        llm_factory,
-        semaphore,
+        default_llm_factory,
+        None,
         max_attempts=max_attempts,
         retry_delay=retry_delay,
     )
+    await _store_response(cache_key, result)
+    return result
 
 
-def run_async_task(coro: Coroutine[Any, Any, Any]):
-    """Run an async coroutine, handling existing event loops if necessary."""
+def _run_on_private_loop(coro: Coroutine[Any, Any, Any]):
+    """Run an async coroutine on its own event loop, handling existing event loops if necessary."""
     try:
         return asyncio.run(coro)
     except RuntimeError as error:
@@ -125,20 +227,43 @@ def run_async_task(coro: Coroutine[Any, Any, Any]):
         raise
 
 
-def get_portfolio_summary(metrics_analyses: List[dict]) -> str:
+def run_async_task(coro: Coroutine[Any, Any, Any]):
+    """Run an async coroutine on the shared background loop, blocking for its result.
+    
+    Falls back to a private per-call loop when the background loop cannot be
+    started or has been closed.
+    """
+    try:
+        loop = _get_loop()
+    except RuntimeError as error:
+        logger.warning("Background event loop unavailable (%s); using a private loop", error)
+        return _run_on_private_loop(coro)
+    if loop.is_closed():
+        logger.warning("Background event loop is closed; using a private loop")
+        return _run_on_private_loop(coro)
+    return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+
+def get_portfolio_summary(metrics_analyses: List[dict], refresh: bool = False) -> LLMResult:
     """Generate a portfolio-level summary using the LLM."""
     try:
         prompt = create_portfolio_summary_prompt(metrics_analyses)
-        response_content = run_async_task(
-            invoke_text_prompt(prompt, max_attempts=MAX_LLM_ATTEMPTS, retry_delay=LLM_RETRY_DELAY)
+        return run_async_task(
+            invoke_text_prompt(
+                prompt, max_attempts=MAX_LLM_ATTEMPTS, retry_delay=LLM_RETRY_DELAY, refresh=refresh
+            )
         )
-        return response_content
     except Exception as error:  # noqa: BLE001 - propagate readable error upstream
-        return f"Error generating portfolio summary: {str(error)}\n\nPlease check your Google API key."
+        return LLMResult(
+            f"Error generating portfolio summary: {str(error)}\n\nPlease check your Google API key.", ok=False
+        )
 
 
 __all__ = [
     "LLMRequest",
+    "LLMResult",
+    "LLM_MODEL_NAME",
+    "default_llm_factory",
     "get_portfolio_summary",
     "invoke_llm_with_retry",
     "invoke_text_prompt",
@@ -0,0 +1,96 @@
+"""Exact-match cache of LLM responses, persisted to SQLite across report runs.
+
+Prompts are pure functions of the metric data, so an identical prompt (and
+chart image) can reuse the stored response instead of another API round-trip.
+"""
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from hashlib import blake2b
+from typing import Optional
+
+from .config import LLM_CACHE_PATH, LLM_CACHE_TTL_SECONDS, logger
+
+
+class LLMResponseCache:
+    """SQLite-backed store of LLM responses keyed on a hash of the request content.
+
+    Storage errors are logged and treated as cache misses so a broken cache
+    file never blocks the analysis. Entries older than ``ttl_seconds`` count
+    as misses, so responses are regenerated periodically.
+    """
+
+    def __init__(self, path: str, ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Return a stable hex digest for the given request components."""
+        digest = blake2b(digest_size=32)
+        for part in parts:
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, created_at TEXT NOT NULL)"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key``, or None on a miss or expired entry."""
+        # created_at is a fixed-width ISO timestamp, so it compares as text
+        cutoff = ""
+        if self.ttl_seconds is not None:
+            cutoff = (datetime.now() - timedelta(seconds=self.ttl_seconds)).isoformat(timespec="seconds")
+        with self._lock:
+            try:
+                row = self._connection().execute(
+                    "SELECT response FROM llm_responses WHERE key = ? AND created_at >= ?", (key, cutoff)
+                ).fetchone()
+            except sqlite3.Error as error:
+                logger.warning("LLM cache lookup failed: %s", error)
+                row = None
+
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store ``response`` under ``key``, replacing any previous entry."""
+        with self._lock:
+            try:
+                conn = self._connection()
+                conn.execute(
+                    "INSERT OR REPLACE INTO llm_responses (key, response, created_at) VALUES (?, ?, ?)",
+                    (key, response, datetime.now().isoformat(timespec="seconds")),
+                )
+                conn.commit()
+            except sqlite3.Error as error:
+                logger.warning("LLM cache write failed: %s", error)
+
+    def log_stats(self) -> None:
+        """Log the hit rate accumulated since start-up."""
+        total = self.hits + self.misses
+        if total:
+            logger.info(
+                "LLM cache hit rate %.0f%% (%s/%s lookups)", 100.0 * self.hits / total, self.hits, total
+            )
+
+
+llm_response_cache = LLMResponseCache(LLM_CACHE_PATH, ttl_seconds=LLM_CACHE_TTL_SECONDS)
+
+
+__all__ = ["LLMResponseCache", "llm_response_cache"]
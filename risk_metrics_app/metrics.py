@@ -2,16 +2,27 @@ import re
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from risk_metrics_app.config import NODE_COLUMN
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; the numpy path is used without it
+    njit = None
+
 PRIORITY_METRICS = ["VaR", "SVaR", "STTHH"]
 
 VALUE_DATE_COLUMN = "valuedate"
 LIMIT_MAX_SUFFIX = "_limmaxvalue"
 LIMIT_MIN_SUFFIX = "_limminvalue"
 
+_LIMIT_MAX_RE = re.compile(r"_limmaxvalue$", re.IGNORECASE)
+_LIMIT_MIN_RE = re.compile(r"_limminvalue$", re.IGNORECASE)
+
+LimitArrays = Dict[str, Tuple[Optional[np.ndarray], Optional[np.ndarray]]]
+
 
 @dataclass
 class InterpolatedSeries:
@@ -149,7 +160,9 @@ def interpolate_for_display(series: pd.Series, date_index: pd.DatetimeIndex) ->
     """Interpolate time series to fill systematic gaps for chart display.
     
     Uses time-based linear interpolation to fill NaN values while preserving
-    the original series for accurate statistical calculations.
+    the original series for accurate statistical calculations. Leading NaNs
+    are kept and trailing NaNs carry the last observed value, matching
+    ``Series.interpolate(method='time')``.
     
     Args:
         series: Original data series with potential NaN gaps.
@@ -158,14 +171,19 @@ def interpolate_for_display(series: pd.Series, date_index: pd.DatetimeIndex) ->
     Returns:
         InterpolatedSeries with both display (interpolated) and original data.
     """
-    # Create a series with datetime index for time-based interpolation
-    indexed_series = pd.Series(series.values, index=date_index)
-    
-    # Apply time-based linear interpolation
-    interpolated = indexed_series.interpolate(method='time')
-    
-    # Convert back to regular index matching original
-    display_series = pd.Series(interpolated.values, index=series.index, name=series.name)
+    values = series.to_numpy(dtype=np.float64)
+    timestamps = pd.DatetimeIndex(date_index).asi8.astype(np.float64)
+    valid = ~np.isnan(values)
+
+    if valid.any():
+        # np.interp needs increasing sample points; dates are not guaranteed sorted
+        valid_ts = timestamps[valid]
+        order = np.argsort(valid_ts, kind="stable")
+        filled = np.interp(timestamps, valid_ts[order], values[valid][order], left=np.nan)
+    else:
+        filled = values.copy()
+
+    display_series = pd.Series(filled, index=series.index, name=series.name)
     
     return InterpolatedSeries(
         display=display_series,
@@ -175,8 +193,8 @@ def interpolate_for_display(series: pd.Series, date_index: pd.DatetimeIndex) ->
 
 def _strip_limit_suffix(column_name: str) -> str:
     """Remove known limit suffixes from a column name in a case-insensitive way."""
-    stripped = re.sub(r"(?i)_limmaxvalue$", "", column_name)
-    stripped = re.sub(r"(?i)_limminvalue$", "", stripped)
+    stripped = _LIMIT_MAX_RE.sub("", column_name)
+    stripped = _LIMIT_MIN_RE.sub("", stripped)
     return stripped
 
 
@@ -253,55 +271,171 @@ def organize_metrics(df: pd.DataFrame) -> List[str]:
     return priority_cols + sorted_other_cols
 
 
+def _numpy_stats_and_outliers(arr: np.ndarray) -> Tuple[int, float, float, float, float, np.ndarray]:
+    """Return (count, mean, std, min, max, outlier_mask) over the non-NaN values."""
+    valid = arr[~np.isnan(arr)]
+    if not valid.size:
+        return 0, np.nan, np.nan, np.nan, np.nan, np.zeros(arr.size, dtype=np.bool_)
+
+    mean = valid.mean()
+    std = valid.std(ddof=1) if valid.size > 1 else np.nan
+    if std > 0:
+        # Single mask over the array used for the stats; NaN compares False
+        mask = np.abs(arr - mean) > 2 * std
+    else:
+        mask = np.zeros(arr.size, dtype=np.bool_)
+    return valid.size, mean, std, valid.min(), valid.max(), mask
+
+
+if njit is not None:
+
+    @njit(cache=True)
+    def _numba_stats_and_outliers(arr):
+        """Compiled two-pass equivalent of :func:`_numpy_stats_and_outliers`.
+
+        fastmath is deliberately off: it assumes no NaNs, which would break the
+        gap handling.
+        """
+        n = 0
+        total = 0.0
+        lo = np.inf
+        hi = -np.inf
+        for x in arr:
+            if not np.isnan(x):
+                n += 1
+                total += x
+                if x < lo:
+                    lo = x
+                if x > hi:
+                    hi = x
+
+        mask = np.zeros(arr.size, dtype=np.bool_)
+        if n == 0:
+            return n, np.nan, np.nan, np.nan, np.nan, mask
+        mean = total / n
+        if n < 2:
+            return n, mean, np.nan, lo, hi, mask
+
+        sq_dev = 0.0
+        for x in arr:
+            if not np.isnan(x):
+                sq_dev += (x - mean) * (x - mean)
+        std = np.sqrt(sq_dev / (n - 1))
+
+        if std > 0:
+            threshold = 2 * std
+            for i in range(arr.size):
+                x = arr[i]
+                if not np.isnan(x) and abs(x - mean) > threshold:
+                    mask[i] = True
+        return n, mean, std, lo, hi, mask
+
+    _stats_and_outliers = _numba_stats_and_outliers
+else:
+    _stats_and_outliers = _numpy_stats_and_outliers
+
+
 def calculate_statistics(data: pd.Series) -> Tuple[dict, pd.Series]:
     """Calculate summary statistics and identify ±2σ outliers."""
+    arr = data.to_numpy(dtype=np.float64)
+    n_valid, mean, std, data_min, data_max, mask = _stats_and_outliers(arr)
+
     stats = {
-        "mean": data.mean(),
-        "median": data.median(),
-        "std": data.std(),
-        "min": data.min(),
-        "max": data.max(),
+        "mean": mean,
+        "median": np.nanmedian(arr) if n_valid else np.nan,
+        "std": std,
+        "min": data_min,
+        "max": data_max,
         "count": len(data),
     }
 
-    if stats["std"] > 0:
-        upper_threshold = stats["mean"] + 2 * stats["std"]
-        lower_threshold = stats["mean"] - 2 * stats["std"]
-        outliers = data[(data > upper_threshold) | (data < lower_threshold)]
+    if mask.any():
+        outliers = pd.Series(arr[mask], index=data.index[mask], name=data.name)
     else:
         outliers = pd.Series(dtype=float)
 
     return stats, outliers
 
 
+def _limit_array(limit) -> Optional[np.ndarray]:
+    """Return the limit as a float array, or None when it has no finite values."""
+    if limit is None:
+        return None
+    limit_arr = np.asarray(limit, dtype=np.float64)
+    if not np.isfinite(limit_arr).any():
+        return None
+    return limit_arr
+
+
+def build_limit_arrays(df: pd.DataFrame) -> LimitArrays:
+    """Map each metric to its (max, min) limit arrays in a single scan of the columns.
+    
+    Limits are forward-filled (a limit is assumed unchanged until restated), so
+    the arrays align row-for-row with ``df`` and may vary over time.
+    
+    Args:
+        df: DataFrame containing metric and limit columns.
+        
+    Returns:
+        Dictionary mapping metric name to a (max_limit, min_limit) tuple of
+        float arrays; a side is None when that limit column is absent.
+    """
+    max_cols: Dict[str, str] = {}
+    min_cols: Dict[str, str] = {}
+    for col in df.columns:
+        if _LIMIT_MAX_RE.search(col):
+            max_cols[_LIMIT_MAX_RE.sub("", col)] = col
+        elif _LIMIT_MIN_RE.search(col):
+            min_cols[_LIMIT_MIN_RE.sub("", col)] = col
+
+    def _filled(col: Optional[str]) -> Optional[np.ndarray]:
+        return df[col].ffill().to_numpy(dtype=np.float64) if col is not None else None
+
+    return {
+        metric: (_filled(max_cols.get(metric)), _filled(min_cols.get(metric)))
+        for metric in {**max_cols, **min_cols}
+    }
+
+
 def check_limit_breaches(
     df: pd.DataFrame,
     metric_name: str,
     max_limit=None,
     min_limit=None,
+    limit_arrays: Optional[LimitArrays] = None,
 ) -> List[dict]:
-    """Check for limit breaches for a given metric."""
+    """Check for limit breaches for a given metric.
+    
+    Limits may be scalars or per-row series. When ``limit_arrays`` from
+    :func:`build_limit_arrays` is given, the metric's limits are taken from it
+    instead of ``max_limit``/``min_limit``.
+    """
     breaches: List[dict] = []
-    if max_limit is not None:
-        max_breaches = df[df[metric_name] > max_limit]
-        if not max_breaches.empty:
-            breach_dates = max_breaches[VALUE_DATE_COLUMN].dt.strftime("%Y-%m-%d").tolist()
-            breaches.append(
-                {
-                    "type": "max",
-                    "count": len(max_breaches),
-                    "dates": breach_dates,
-                }
-            )
-    if min_limit is not None:
-        min_breaches = df[df[metric_name] < min_limit]
-        if not min_breaches.empty:
-            breach_dates = min_breaches[VALUE_DATE_COLUMN].dt.strftime("%Y-%m-%d").tolist()
+    if limit_arrays is not None:
+        max_limit, min_limit = limit_arrays.get(metric_name, (None, None))
+    max_arr = _limit_array(max_limit)
+    min_arr = _limit_array(min_limit)
+    if max_arr is None and min_arr is None:
+        return breaches
+
+    values = df[metric_name].to_numpy(dtype=np.float64)
+    day_vals = df[VALUE_DATE_COLUMN].to_numpy(dtype="datetime64[D]")
+
+    # NaN compares False on either side, so missing values or limits never breach
+    for breach_type, limit_arr, mask_fn in (
+        ("max", max_arr, np.greater),
+        ("min", min_arr, np.less),
+    ):
+        if limit_arr is None:
+            continue
+        mask = mask_fn(values, limit_arr)
+        count = int(mask.sum())
+        if count:
             breaches.append(
                 {
-                    "type": "min",
-                    "count": len(min_breaches),
-                    "dates": breach_dates,
+                    "type": breach_type,
+                    "count": count,
+                    "dates": np.datetime_as_string(day_vals[mask], unit="D").tolist(),
                 }
             )
 
@@ -314,6 +448,8 @@ __all__ = [
     "LIMIT_MIN_SUFFIX",
     "VALUE_DATE_COLUMN",
     "InterpolatedSeries",
+    "LimitArrays",
+    "build_limit_arrays",
     "calculate_statistics",
     "check_limit_breaches",
     "detect_node_column",
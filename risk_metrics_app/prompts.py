@@ -1,32 +1,21 @@
-from typing import List, Sequence
+import io
+import math
+import sys
+from string import Template
+from typing import TYPE_CHECKING, List, Optional, Sequence
 
-from pandas import Series
+if TYPE_CHECKING:  # pandas is only needed for the annotation
+    from pandas import Series
 
+# Static prompt scaffolding lives in module-level templates so each call only
+# formats the dynamic fields.
+_STATISTICAL_PROFILE_TMPL = """STATISTICAL PROFILE:
+- Mean: {mean} | Median: {median}
+- Std Deviation: {std} | Coefficient of Variation: {cv}
+- Range: [{min}, {max}] | Spread: {range}
+- Sample Size: {count} observations{outlier_info}{breach_info}"""
 
-def create_llm_prompt(metric_name: str, stats: dict, outliers: Series, breaches: Sequence[str], has_limits: bool) -> str:
-    """Create a detailed prompt for single-metric LLM analysis."""
-    outlier_info = ""
-    if len(outliers) > 0:
-        outlier_values = [f"{val:.4f}" for val in outliers[:5]]
-        outlier_info = f"\n\nOutliers (2 SD from mean, showing up to 5): {', '.join(outlier_values)}"
-        if len(outliers) > 5:
-            outlier_info += f"\n(Total outliers: {len(outliers)})"
-
-    breach_info = ""
-    if breaches:
-        breach_info = f"\n\nLimit Breaches: {'; '.join(breaches)}"
-
-    text_content = f"""
-You are a senior quantitative risk analyst with deep expertise in market risk metrics and trading desk behavior. 
-Analyze the {metric_name} risk metric chart with both statistical rigor and practical business insight.
-
-STATISTICAL PROFILE:
-- Mean: {stats['mean']:.4f} | Median: {stats['median']:.4f}
-- Std Deviation: {stats['std']:.4f} | Coefficient of Variation: {stats['std']/abs(stats['mean']):.2%}
-- Range: [{stats['min']:.4f}, {stats['max']:.4f}] | Spread: {stats['max'] - stats['min']:.4f}
-- Sample Size: {stats['count']} observations{outlier_info}{breach_info}
-
-ANALYSIS FRAMEWORK:
+_ANALYSIS_INSTRUCTIONS = """ANALYSIS FRAMEWORK:
 
 1. VISUAL PATTERN RECOGNITION (2-3 sentences)
    - Describe the dominant trend (upward/downward/mean-reverting/volatile)
@@ -57,61 +46,71 @@ DELIVERY REQUIREMENTS:
 - Prioritize signal over noise—focus on material observations only
 """
 
-    return text_content
-
-
-def create_portfolio_summary_prompt(metrics_analyses: List[dict]) -> str:
-    """Craft the portfolio-level prompt using XML-like structure for the LLM."""
-    metrics_xml_blocks = []
-
-    for analysis in metrics_analyses:
-        metric = analysis["metric"]
-        stats = analysis["stats"]
-        outliers = analysis["outliers"]
-        breaches = analysis["breaches"]
-        insights = analysis["insights"]
-
-        outlier_info = ""
-        if len(outliers) > 0:
-            outlier_info = f"""
+_SINGLE_METRIC_TMPL = (
+    "\nYou are a senior quantitative risk analyst with deep expertise in market risk metrics "
+    "and trading desk behavior. \n"
+    "Analyze the {metric_name} risk metric chart with both statistical rigor and practical business insight.\n\n"
+    + _STATISTICAL_PROFILE_TMPL
+    + "\n\n"
+    + _ANALYSIS_INSTRUCTIONS
+)
+
+# Compact mode sends the static instructions once as a system message (which
+# providers can cache as a shared prefix) and only the statistics per metric.
+SINGLE_METRIC_SYSTEM_PROMPT = (
+    "You are a senior quantitative risk analyst with deep expertise in market risk metrics "
+    "and trading desk behavior.\n"
+    "Analyze the risk metric chart and statistical profile supplied by the user with both "
+    "statistical rigor and practical business insight.\n\n"
+    + _ANALYSIS_INSTRUCTIONS
+)
+
+_COMPACT_USER_TMPL = "Metric: {metric_name}\n\n" + _STATISTICAL_PROFILE_TMPL
+
+PROMPT_MODES = ("full", "compact")
+
+# Free text embedded in the portfolio prompt's XML must not break its structure
+_XML_ESCAPE = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
+# The per-metric XML blocks are rendered for every metric in the portfolio, so
+# they are compiled once as string.Template objects
+_METRIC_XML_TMPL = Template("""
+  <risk_metric>
+    <name>$metric</name>
+    <statistics>
+      <mean>$mean</mean>
+      <median>$median</median>
+      <std_deviation>$std</std_deviation>
+      <min>$min</min>
+      <max>$max</max>
+      <range>$range</range>
+      <data_points>$count</data_points>
+    </statistics>""")
+
+_OUTLIERS_XML_TMPL = Template("""
     <outliers>
-      <count>{len(outliers)}</count>
-    </outliers>"""
+      <count>$count</count>
+    </outliers>""")
 
-        breach_info = ""
-        if breaches:
-            breach_info = f"""
+_BREACHES_XML_TMPL = Template("""
     <limit_breaches>
-      <breaches>{'; '.join(breaches)}</breaches>
-    </limit_breaches>"""
+      <breaches>$breaches</breaches>
+    </limit_breaches>""")
 
-        metric_block = f"""
-  <risk_metric>
-    <name>{metric}</name>
-    <statistics>
-      <mean>{stats['mean']:.4f}</mean>
-      <median>{stats['median']:.4f}</median>
-      <std_deviation>{stats['std']:.4f}</std_deviation>
-      <min>{stats['min']:.4f}</min>
-      <max>{stats['max']:.4f}</max>
-      <range>{stats['max'] - stats['min']:.4f}</range>
-      <data_points>{stats['count']}</data_points>
-    </statistics>{outlier_info}{breach_info}
+_INSIGHTS_XML_TMPL = Template("""
     <individual_insights>
-{insights}
+$insights
     </individual_insights>
-  </risk_metric>"""
-
-        metrics_xml_blocks.append(metric_block)
+  </risk_metric>""")
 
-    all_metrics_xml = "\n".join(metrics_xml_blocks)
-
-    prompt = f"""
+_PORTFOLIO_HEADER = """
 
 You are the Chief Risk Officer conducting a comprehensive portfolio risk review. Your task is to synthesize individual risk metric analyses into a cohesive assessment of the desk's risk profile, trading behavior, and control environment.
 
 <individual_metric_analyses>
-{all_metrics_xml}
+"""
+
+_PORTFOLIO_FOOTER = """
 </individual_metric_analyses>
 
 SYNTHESIS REQUIREMENTS:
@@ -183,7 +182,122 @@ DELIVERABLE FORMAT:
 - Executive-ready: clear, concise, actionable
 """
 
-    return prompt
 
+def format_stats(stats: dict) -> dict:
+    """Render the statistics used by the prompts as display strings.
+    
+    Computed once per metric and stored on the analysis record as ``"fmt"`` so
+    the single-metric and portfolio prompts share the conversions. The
+    coefficient of variation is ``"n/a"`` when it is undefined (zero or
+    non-finite mean, non-finite std).
+    """
+    mean = stats["mean"]
+    std = stats["std"]
+    if mean and math.isfinite(mean) and math.isfinite(std):
+        cv = f"{std / abs(mean):.2%}"
+    else:
+        cv = "n/a"
+    return {
+        "mean": f"{mean:.4f}",
+        "median": f"{stats['median']:.4f}",
+        "std": f"{std:.4f}",
+        "min": f"{stats['min']:.4f}",
+        "max": f"{stats['max']:.4f}",
+        "range": f"{stats['max'] - stats['min']:.4f}",
+        "count": str(stats["count"]),
+        "cv": cv,
+    }
+
+
+def _join_breaches(breaches: Sequence) -> str:
+    """Join breach descriptions, accepting plain strings or ``check_limit_breaches`` dicts."""
+    parts = []
+    for breach in breaches:
+        if isinstance(breach, dict):
+            label = "Max" if breach["type"] == "max" else "Min"
+            breach = f"{label} limit breached {breach['count']} times on {', '.join(breach['dates'])}"
+        # Breach descriptions recur across the single-metric and portfolio prompts
+        parts.append(sys.intern(breach))
+    return "; ".join(parts)
+
+
+def create_llm_prompt(
+    metric_name: str,
+    stats: dict,
+    outliers: "Series",
+    breaches: Sequence[str],
+    has_limits: bool,
+    mode: str = "full",
+    fmt: Optional[dict] = None,
+) -> str:
+    """Create a detailed prompt for single-metric LLM analysis.
+    
+    ``mode="full"`` returns a self-contained prompt. ``mode="compact"`` returns
+    only the metric-specific part; send it alongside
+    ``SINGLE_METRIC_SYSTEM_PROMPT`` as the system message. ``fmt`` is the
+    pre-rendered output of :func:`format_stats`, computed here when omitted.
+    """
+    if mode not in PROMPT_MODES:
+        raise ValueError(f"Unknown prompt mode {mode!r}; expected one of {PROMPT_MODES}")
+    metric_name = sys.intern(str(metric_name))
+
+    outlier_info = ""
+    n_out = outliers.size
+    if n_out:
+        outlier_values = outliers.head(5).map("{:.4f}".format).tolist()
+        outlier_info = f"\n\nOutliers (2 SD from mean, showing up to 5): {', '.join(outlier_values)}"
+        if n_out > 5:
+            outlier_info += f"\n(Total outliers: {n_out})"
 
-__all__ = ["create_llm_prompt", "create_portfolio_summary_prompt"]
+    breach_info = ""
+    if breaches:
+        breach_info = f"\n\nLimit Breaches: {_join_breaches(breaches)}"
+
+    template = _SINGLE_METRIC_TMPL if mode == "full" else _COMPACT_USER_TMPL
+    return template.format(
+        metric_name=metric_name,
+        outlier_info=outlier_info,
+        breach_info=breach_info,
+        **(fmt or format_stats(stats)),
+    )
+
+
+def _render_metric_xml(analysis: dict) -> str:
+    """Render one ``<risk_metric>`` block of the portfolio prompt."""
+    fmt = analysis.get("fmt") or format_stats(analysis["stats"])
+    metric = sys.intern(str(analysis["metric"]))
+    n_out = analysis["outliers"].size
+    breaches = analysis["breaches"]
+
+    buf = io.StringIO()
+    buf.write(_METRIC_XML_TMPL.substitute(fmt, metric=metric.translate(_XML_ESCAPE)))
+    if n_out:
+        buf.write(_OUTLIERS_XML_TMPL.substitute(count=n_out))
+    if breaches:
+        buf.write(_BREACHES_XML_TMPL.substitute(breaches=_join_breaches(breaches).translate(_XML_ESCAPE)))
+    buf.write(_INSIGHTS_XML_TMPL.substitute(insights=str(analysis["insights"]).translate(_XML_ESCAPE)))
+    return buf.getvalue()
+
+
+def create_portfolio_summary_prompt(metrics_analyses: List[dict]) -> str:
+    """Craft the portfolio-level prompt using XML-like structure for the LLM."""
+    metric_blocks = [_render_metric_xml(analysis) for analysis in metrics_analyses]
+
+    # Stream every fragment into one buffer rather than concatenating strings
+    buf = io.StringIO()
+    buf.write(_PORTFOLIO_HEADER)
+    for idx, block in enumerate(metric_blocks):
+        if idx:
+            buf.write("\n")
+        buf.write(block)
+    buf.write(_PORTFOLIO_FOOTER)
+    return buf.getvalue()
+
+
+__all__ = [
+    "PROMPT_MODES",
+    "SINGLE_METRIC_SYSTEM_PROMPT",
+    "create_llm_prompt",
+    "create_portfolio_summary_prompt",
+    "format_stats",
+]
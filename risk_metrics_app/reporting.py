@@ -1,13 +1,235 @@
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from io import BytesIO
-from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from io import BytesIO, StringIO
+from itertools import chain, islice
+from operator import itemgetter
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import json
+import multiprocessing
+import os
 import zipfile
 import re
+import tempfile
 
+import plotly.graph_objects as go
 import plotly.io as pio
 
+from .config import MAX_CHART_POINTS
 from .metrics import PRIORITY_METRICS, parse_metric_name, get_maturity_order
-from .visuals import create_limit_annotation_html
+from .visuals import create_limit_annotation_html, downsample_figure, needs_downsampling
+
+_NON_ALNUM_RE = re.compile(r'[^a-z0-9]+')
+
+# Position of each priority metric (case-insensitive) in the report order
+_PRIORITY_RANK = {metric.lower(): rank for rank, metric in enumerate(PRIORITY_METRICS)}
+# Characters invalid in Windows/Unix file paths, mapped to underscores
+_PATH_SANITIZE_TABLE = str.maketrans(dict.fromkeys('<>:"/\\|?*', '_'))
+
+# plotly.js is loaded once in the report <head>; the per-chart specs are plain
+# JSON rendered client-side with one shared config
+_PLOTLY_SCRIPT_TAG = '<script src="https://cdn.plot.ly/plotly-2.35.2.min.js" charset="utf-8"></script>'
+# Tailwind is pinned to a fixed release so the browser can keep one cached copy
+# across reports; the config is minified since it is repeated in every report
+_TAILWIND_SCRIPT_TAGS = (
+    '<script src="https://cdn.tailwindcss.com/3.4.17"></script>\n'
+    '    <script>tailwind.config={theme:{extend:{fontFamily:{'
+    "sans:['Inter','system-ui','sans-serif'],"
+    "mono:['JetBrains Mono','Consolas','monospace']"
+    '}}}}</script>'
+)
+_PLOTLY_CONFIG_JSON = json.dumps({"responsive": True, "displayModeBar": False, "displaylogo": False})
+
+# Size of the chart PNGs bundled into the export packages
+_PNG_EXPORT_OPTIONS = {"format": "png", "width": 1200, "height": 600, "scale": 2}
+# Line traces are reduced to about one point per output pixel column before
+# rasterising; extra points cannot show up in the PNG
+_PNG_MAX_POINTS = _PNG_EXPORT_OPTIONS["width"] * _PNG_EXPORT_OPTIONS["scale"]
+# PNG workers are spawned, not forked: forking the multi-threaded Streamlit
+# process (server threads, the LLM event loop) can deadlock the child
+_PNG_MP_CONTEXT = multiprocessing.get_context("spawn")
+
+# Text members (HTML, CSV, summaries) are deflated at a low zlib level, which
+# keeps most of the size win at a fraction of the default level's CPU cost;
+# PNGs are already deflate-compressed and are stored as-is
+_ZIP_TEXT_COMPRESSLEVEL = 3
+
+
+# Header badge and footer disclaimer, chosen by whether AI insights were enabled
+_AI_ENABLED_BADGE = '<span class="inline-flex items-center gap-1.5 px-3 py-1 bg-emerald-100 text-emerald-700 rounded-full text-sm font-medium"><svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>AI Enabled</span>'
+_AI_DISABLED_BADGE = '<span class="inline-flex items-center gap-1.5 px-3 py-1 bg-gray-100 text-gray-600 rounded-full text-sm font-medium"><svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M10 14l2-2m0 0l2-2m-2 2l-2-2m2 2l2 2m7-2a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>AI Disabled</span>'
+_AI_DISCLAIMER = "Generated by AI, use with caution."
+_AUTO_DISCLAIMER = "Generated automatically, review before use."
+
+# "AI Analysis Mode" line of the text summaries, keyed by use_llm
+_AI_MODE_LABELS = {True: "Enabled (Google Gemini)", False: "Disabled"}
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Plain-text summary blocks, shared by the single and batch exports
+_SUMMARY_SEP = "=" * 80
+_SUMMARY_METRIC_TMPL = """
+{metric} ANALYSIS
+{sep}
+
+Statistics:
+- Mean: {stats[mean]:.4f}
+- Median: {stats[median]:.4f}
+- Standard Deviation: {stats[std]:.4f}
+- Min: {stats[min]:.4f}
+- Max: {stats[max]:.4f}{breach_text}
+
+"""
+_SUMMARY_BREACH_LINE_TMPL = "  - {label} limit breached {count} times on {dates}"
+_SUMMARY_INSIGHTS_TMPL = """
+
+AI Insights:
+{insights}
+
+{sep}
+
+"""
+_SUMMARY_METRIC_END = f"""
+
+{_SUMMARY_SEP}
+
+"""
+
+# Static markup for the per-metric parts of the HTML report, formatted with
+# only the variable slots on each iteration
+_TOC_ITEM_TMPL = '''
+            <a href="#{anchor_id}" 
+               class="metric-nav-item group p-3 bg-white hover:bg-blue-50 border border-gray-200 hover:border-blue-400 rounded-xl transition-all duration-200 shadow-sm hover:shadow-md focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2">
+                <div class="flex items-center gap-2">
+                    <div class="w-2 h-2 rounded-full bg-blue-500 group-hover:bg-blue-600 transition-colors flex-shrink-0"></div>
+                    <span class="text-sm font-medium text-gray-700 group-hover:text-blue-600 truncate transition-colors">{metric}</span>
+                </div>
+            </a>
+        '''
+
+_STAT_CARD_TMPL = '''<div class="bg-slate-700 rounded-xl p-4 text-white shadow-md{extra_class}">
+                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">{label}</div>
+                        <div class="text-xl sm:text-2xl font-bold font-mono">{value}</div>
+                    </div>'''
+
+# (label, stats key, extra classes) for the stats grid of each metric card
+_STAT_CARDS = (
+    ("Mean", "mean", ""),
+    ("Median", "median", ""),
+    ("Std Dev", "std", ""),
+    ("Min", "min", ""),
+    ("Max", "max", " col-span-2 sm:col-span-1"),
+)
+
+_OUTLIER_BOX_TMPL = '''
+            <div class="bg-amber-50 border border-amber-200 rounded-xl p-5 mb-6">
+                <div class="flex items-start gap-3">
+                    <div class="flex-shrink-0">
+                        <svg class="w-6 h-6 text-amber-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path>
+                        </svg>
+                    </div>
+                    <div class="flex-1 min-w-0">
+                        <h4 class="text-base font-semibold text-amber-800 mb-2">Detected Outliers (±2 SD)</h4>
+                        <div class="space-y-1 text-sm text-amber-700">
+                            <p><span class="font-medium">Total outliers:</span> {count}</p>
+                            <p><span class="font-medium">Sample values:</span> {sample_values}</p>
+                            <p><span class="font-medium">Dates:</span> {date_list}{more_flag}</p>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            '''
+
+_BREACH_ITEM_TMPL = '''
+                    <li class="flex items-start gap-2">
+                        <svg class="w-5 h-5 {icon_color} flex-shrink-0 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4m0 4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
+                        </svg>
+                        <span><strong>{label} limit</strong> breached {count} times on {date_str}{more_flag}</span>
+                    </li>
+                '''
+
+_BREACH_BOX_TMPL = '''
+            <div class="bg-red-50 border border-red-200 rounded-xl p-5 mb-6">
+                <div class="flex items-start gap-3">
+                    <div class="flex-shrink-0">
+                        <svg class="w-6 h-6 text-red-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path>
+                        </svg>
+                    </div>
+                    <div class="flex-1 min-w-0">
+                        <h4 class="text-base font-semibold text-red-800 mb-3">Limit Breaches Detected</h4>
+                        <ul class="space-y-2 text-sm text-red-700">
+                            {items}
+                        </ul>
+                    </div>
+                </div>
+            </div>
+            '''
+
+_INSIGHTS_BOX_TMPL = '''
+            <div class="mt-8 bg-gradient-to-br from-blue-50 to-cyan-50 border border-blue-200 rounded-xl p-6">
+                <div class="flex items-center gap-3 mb-4">
+                    <div class="p-2 bg-blue-100 rounded-lg">
+                        <svg class="w-5 h-5 text-blue-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9.663 17h4.673M12 3v1m6.364 1.636l-.707.707M21 12h-1M4 12H3m3.343-5.657l-.707-.707m2.828 9.9a5 5 0 117.072 0l-.548.547A3.374 3.374 0 0014 18.469V19a2 2 0 11-4 0v-.531c0-.895-.356-1.754-.988-2.386l-.548-.547z"></path>
+                        </svg>
+                    </div>
+                    <h3 class="text-lg font-semibold text-blue-900">AI-Generated Insights</h3>
+                </div>
+                <div class="prose prose-sm max-w-none text-gray-700 leading-relaxed">
+                    {insight_text}
+                </div>
+            </div>
+            '''
+
+_METRIC_SECTION_TMPL = '''
+        <article id="{anchor_id}" data-status="{status}" data-metric="{metric_lower}"
+                 class="metric-card mb-10 bg-white border border-gray-200 {border} rounded-2xl shadow-lg overflow-hidden scroll-mt-32">
+            <!-- Metric Header -->
+            <div class="bg-gradient-to-r from-gray-50 to-white border-b border-gray-100 px-6 py-5 sm:px-8 sm:py-6">
+                <div class="flex flex-col sm:flex-row sm:items-center sm:justify-between gap-4">
+                    <div class="flex items-center gap-3">
+                        <div class="p-2 bg-blue-100 rounded-lg">
+                            <svg class="w-6 h-6 text-blue-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 19v-6a2 2 0 00-2-2H5a2 2 0 00-2 2v6a2 2 0 002 2h2a2 2 0 002-2zm0 0V9a2 2 0 012-2h2a2 2 0 012 2v10m-6 0a2 2 0 002 2h2a2 2 0 002-2m0 0V5a2 2 0 012-2h2a2 2 0 012 2v14a2 2 0 01-2 2h-2a2 2 0 01-2-2z"></path>
+                            </svg>
+                        </div>
+                        <h2 class="text-2xl sm:text-3xl font-bold text-gray-900">{metric}</h2>
+                    </div>
+                    <a href="#top" class="inline-flex items-center gap-2 px-4 py-2 bg-gray-100 hover:bg-gray-200 border border-gray-200 rounded-lg text-gray-600 hover:text-gray-800 transition-all text-sm font-medium focus:outline-none focus:ring-2 focus:ring-blue-500">
+                        <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
+                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 10l7-7m0 0l7 7m-7-7v18"></path>
+                        </svg>
+                        <span>Back to top</span>
+                    </a>
+                </div>
+            </div>
+            
+            <!-- Metric Content -->
+            <div class="p-6 sm:p-8">
+                <!-- Stats Grid -->
+                <div class="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-5 gap-4 mb-8">
+                    {stat_cards}
+                </div>
+                
+                <!-- Alerts -->
+                {outlier_html}
+                {breach_html}
+                {limit_annotation_html}
+                
+                <!-- Chart -->
+                <div class="bg-gray-50 rounded-xl p-4 border border-gray-100">
+                    {fig_html}
+                </div>
+                
+                <!-- AI Insights -->
+                {insights_html}
+            </div>
+        </article>
+        '''
 
 
 def metric_status(analysis: dict) -> str:
@@ -30,6 +252,7 @@ def kpi_counts(metrics_analyses: List[dict]) -> dict:
     return counts
 
 
+@lru_cache(maxsize=4096)
 def make_anchor_id(metric: str) -> str:
     """
     Generate a safe HTML anchor ID from a metric name.
@@ -50,24 +273,23 @@ def make_anchor_id(metric: str) -> str:
     """
     # Convert to lowercase
     anchor = metric.lower()
-    # Replace non-alphanumeric characters with dash
-    anchor = re.sub(r'[^a-z0-9]+', '-', anchor)
-    # Collapse repeated dashes
-    anchor = re.sub(r'-+', '-', anchor)
+    # Replace runs of non-alphanumeric characters with a single dash
+    anchor = _NON_ALNUM_RE.sub('-', anchor)
     # Trim leading/trailing dashes
     anchor = anchor.strip('-')
     # Prefix to avoid collisions and ensure valid ID
     return f"metric-{anchor}"
 
 
+@lru_cache(maxsize=4096)
 def sanitize_node_name(node_name: str) -> str:
-    """Sanitize a node name for safe use in file paths and folder names.
+    """Sanitize a node or metric name for safe use in file paths and folder names.
     
     Replaces characters that are invalid in file system paths with underscores
     and trims whitespace.
     
     Args:
-        node_name: The original node name from the data.
+        node_name: The original node (or metric) name from the data.
         
     Returns:
         A sanitized string safe for use in file paths.
@@ -78,13 +300,30 @@ def sanitize_node_name(node_name: str) -> str:
         "  spaces  " -> "spaces"
     """
     # Replace characters invalid in Windows/Unix file paths
-    sanitized = re.sub(r'[<>:"/\\|?*]', '_', node_name)
+    sanitized = node_name.translate(_PATH_SANITIZE_TABLE)
     # Trim whitespace
     sanitized = sanitized.strip()
     # Ensure non-empty
     return sanitized if sanitized else "unnamed_node"
 
 
+def _truncate_join(items: List[str], limit: int = 10, sep: str = ", ", more: str = "…") -> Tuple[str, str]:
+    """Join at most ``limit`` items and return the marker shown when some were cut.
+    
+    Args:
+        items: Strings to join, e.g. outlier or breach dates.
+        limit: Maximum number of items to include.
+        sep: Separator placed between items.
+        more: Marker returned when ``items`` is longer than ``limit``.
+        
+    Returns:
+        Tuple of (joined text, ``more`` if truncated else "").
+    """
+    if len(items) <= limit:
+        return sep.join(items), ""
+    return sep.join(items[:limit]), more
+
+
 def _sort_metrics_by_priority(metrics_analyses: List[dict]) -> List[dict]:
     """Sort metrics analyses by priority (VaR, SVaR, STTHH first) then by name and maturity.
     
@@ -97,40 +336,26 @@ def _sort_metrics_by_priority(metrics_analyses: List[dict]) -> List[dict]:
     Returns:
         Sorted list of metric analyses.
     """
-    # Separate priority metrics from others
-    priority_analyses = []
-    other_analyses = []
-    
+    # Each metric is lowercased and parsed once; the sorts compare the
+    # precomputed keys only
+    priority_keyed = []
+    other_keyed = []
     for analysis in metrics_analyses:
         metric = analysis["metric"]
-        metric_lower = metric.lower()
-        is_priority = any(pm.lower() == metric_lower for pm in PRIORITY_METRICS)
-        if is_priority:
-            priority_analyses.append(analysis)
+        rank = _PRIORITY_RANK.get(metric.lower())
+        if rank is not None:
+            priority_keyed.append((rank, analysis))
         else:
-            other_analyses.append(analysis)
-    
-    # Sort priority metrics in defined order
-    def priority_sort_key(analysis: dict) -> int:
-        metric_lower = analysis["metric"].lower()
-        for idx, pm in enumerate(PRIORITY_METRICS):
-            if pm.lower() == metric_lower:
-                return idx
-        return len(PRIORITY_METRICS)
+            # Other metrics sort by base name, then maturity
+            base_name, maturity = parse_metric_name(metric)
+            maturity_flag = 0 if maturity is None else 1
+            sort_key = (base_name.lower(), maturity_flag, get_maturity_order(maturity), metric)
+            other_keyed.append((sort_key, analysis))
     
-    priority_analyses.sort(key=priority_sort_key)
+    priority_keyed.sort(key=itemgetter(0))
+    other_keyed.sort(key=itemgetter(0))
     
-    # Sort other metrics by base name, then maturity
-    def other_sort_key(analysis: dict) -> Tuple[str, int, int, str]:
-        metric = analysis["metric"]
-        base_name, maturity = parse_metric_name(metric)
-        maturity_order = get_maturity_order(maturity)
-        maturity_flag = 0 if maturity is None else 1
-        return (base_name.lower(), maturity_flag, maturity_order, metric)
-    
-    other_analyses.sort(key=other_sort_key)
-    
-    return priority_analyses + other_analyses
+    return [analysis for _, analysis in priority_keyed] + [analysis for _, analysis in other_keyed]
 
 
 def _build_excluded_metrics_section(
@@ -216,6 +441,98 @@ def _build_excluded_metrics_section(
     '''
 
 
+def _render_metric_section(
+    analysis: dict,
+    anchor_id: str,
+    use_llm: bool,
+    shared_fig_jsons: Optional[Dict[str, Optional[str]]],
+) -> str:
+    """Render the ``<article>`` card for one metric of the HTML report."""
+    status = metric_status(analysis)
+    border = {"breach": "border-l-4 border-l-red-500",
+              "outlier": "border-l-4 border-l-amber-400",
+              "ok": "border-l-4 border-l-emerald-400"}[status]
+    metric = analysis["metric"]
+    stats = analysis["stats"]
+    outliers = analysis["outliers"]
+    outlier_dates = analysis.get("outlier_dates", [])
+    breaches = analysis["breaches"]
+    insights = analysis["insights"]
+    fig = analysis["fig"]
+    scale_context = analysis.get("scale_context")
+
+    plot_div_id = f"plot-{anchor_id}"
+    # Long series are reduced for the browser; a downsampled copy is never in
+    # shared_fig_jsons, so it is always serialised here
+    html_fig = downsample_figure(fig, MAX_CHART_POINTS)
+    fig_json = _take_fig_json(html_fig, metric, shared_fig_jsons)
+    fig_html = (
+        f'<div id="{plot_div_id}" class="lazy-plot" '
+        f'style="min-height:420px"></div>'
+        f'<script type="application/json" class="plot-spec" '
+        f'data-target="{plot_div_id}">{fig_json}</script>'
+    )
+
+    # Generate limit annotation HTML if adaptive scaling was applied
+    limit_annotation_html = ""
+    if scale_context is not None and scale_context.needs_adaptive_scaling:
+        limit_annotation_html = create_limit_annotation_html(scale_context, has_breaches=bool(breaches))
+
+    # Outlier alert box
+    outlier_html = ""
+    if len(outliers) > 0:
+        date_list, more_flag = _truncate_join(outlier_dates)
+        sample_values = ', '.join([f'{v:.4f}' for v in outliers[:5]])
+        outlier_html = _OUTLIER_BOX_TMPL.format(
+            count=len(outliers),
+            sample_values=sample_values,
+            date_list=date_list,
+            more_flag=more_flag,
+        )
+
+    # Breach alert box
+    breach_html = ""
+    if breaches:
+        breach_items = []
+        for breach in breaches:
+            label = "Max" if breach["type"] == "max" else "Min"
+            icon_color = "text-red-500" if breach["type"] == "max" else "text-orange-500"
+            date_str, more_flag = _truncate_join(breach["dates"])
+            breach_items.append(_BREACH_ITEM_TMPL.format(
+                icon_color=icon_color,
+                label=label,
+                count=breach["count"],
+                date_str=date_str,
+                more_flag=more_flag,
+            ))
+
+        breach_html = _BREACH_BOX_TMPL.format(items="".join(breach_items))
+
+    # AI insights section
+    insights_html = ""
+    if use_llm:
+        insight_text = (insights or "No AI insight generated.").replace(chr(10), '<br><br>')
+        insights_html = _INSIGHTS_BOX_TMPL.format(insight_text=insight_text)
+
+    stat_cards = "\n                    ".join(
+        _STAT_CARD_TMPL.format(extra_class=extra_class, label=label, value=f"{stats[key]:.4f}")
+        for label, key, extra_class in _STAT_CARDS
+    )
+    return _METRIC_SECTION_TMPL.format(
+        anchor_id=anchor_id,
+        status=status,
+        metric=metric,
+        metric_lower=metric.lower(),
+        border=border,
+        stat_cards=stat_cards,
+        outlier_html=outlier_html,
+        breach_html=breach_html,
+        limit_annotation_html=limit_annotation_html,
+        fig_html=fig_html,
+        insights_html=insights_html,
+    )
+
+
 def create_html_report(
     metrics_analyses: List[dict],
     portfolio_summary: str,
@@ -242,6 +559,39 @@ def create_html_report(
         excluded_by_keyword: List of metrics excluded by user keyword filter
         excluded_by_limit: List of metrics excluded by limit filter
     """
+    # Stream the chunks into one buffer instead of collecting and re-joining them
+    buf = StringIO()
+    for chunk in iter_html_report(
+        metrics_analyses,
+        portfolio_summary,
+        file_name,
+        use_llm,
+        excluded_by_keyword=excluded_by_keyword,
+        excluded_by_limit=excluded_by_limit,
+    ):
+        buf.write(chunk)
+    return buf.getvalue()
+
+
+def iter_html_report(
+    metrics_analyses: List[dict],
+    portfolio_summary: str,
+    file_name: str,
+    use_llm: bool,
+    excluded_by_keyword: Optional[List[str]] = None,
+    excluded_by_limit: Optional[List[str]] = None,
+    shared_fig_jsons: Optional[Dict[str, Optional[str]]] = None,
+) -> Iterator[str]:
+    """Yield the HTML report produced by :func:`create_html_report` in chunks.
+    
+    The page header (KPIs, navigation), each metric section and the footer are
+    yielded separately, so the full document never has to be held in memory.
+    
+    Args:
+        Same as :func:`create_html_report`, plus:
+        shared_fig_jsons: Figure JSON hand-off map shared with the PNG export
+            of the same analyses; see :func:`_take_fig_json`.
+    """
     # Default to empty lists if not provided
     excluded_by_keyword = excluded_by_keyword or []
     excluded_by_limit = excluded_by_limit or []
@@ -276,199 +626,13 @@ def create_html_report(
         '<p class="text-emerald-600 font-medium">No breaches or outliers detected.</p>'
     )
 
-    # Build navigation items (priority sorted: VaR, SVaR, STTHH first)
-    toc_items = []
-    for analysis in metrics_analyses_sorted:
-        metric = analysis["metric"]
-        anchor_id = make_anchor_id(metric)
-        toc_items.append(f'''
-            <a href="#{anchor_id}" 
-               class="metric-nav-item group p-3 bg-white hover:bg-blue-50 border border-gray-200 hover:border-blue-400 rounded-xl transition-all duration-200 shadow-sm hover:shadow-md focus:outline-none focus:ring-2 focus:ring-blue-500 focus:ring-offset-2">
-                <div class="flex items-center gap-2">
-                    <div class="w-2 h-2 rounded-full bg-blue-500 group-hover:bg-blue-600 transition-colors flex-shrink-0"></div>
-                    <span class="text-sm font-medium text-gray-700 group-hover:text-blue-600 truncate transition-colors">{metric}</span>
-                </div>
-            </a>
-        ''')
-    
-    # Build metric sections (priority sorted: VaR, SVaR, STTHH first)
-    metric_sections = []
-    for analysis in metrics_analyses_sorted:
-        status = metric_status(analysis)
-        border = {"breach": "border-l-4 border-l-red-500",
-                  "outlier": "border-l-4 border-l-amber-400",
-                  "ok": "border-l-4 border-l-emerald-400"}[status]
-        metric = analysis["metric"]
-        anchor_id = make_anchor_id(metric)
-        stats = analysis["stats"]
-        outliers = analysis["outliers"]
-        outlier_dates = analysis.get("outlier_dates", [])
-        breaches = analysis["breaches"]
-        insights = analysis["insights"]
-        fig = analysis["fig"]
-        scale_context = analysis.get("scale_context")
-
-        plot_div_id = f"plot-{make_anchor_id(metric)}"
-        fig_json = fig.to_json()
-        fig_html = (
-            f'<div id="{plot_div_id}" class="lazy-plot" '
-            f'style="min-height:420px"></div>'
-            f'<script type="application/json" class="plot-spec" '
-            f'data-target="{plot_div_id}">{fig_json}</script>'
-        )
-
-        # Generate limit annotation HTML if adaptive scaling was applied
-        limit_annotation_html = ""
-        if scale_context is not None and scale_context.needs_adaptive_scaling:
-            limit_annotation_html = create_limit_annotation_html(scale_context, has_breaches=bool(breaches))
-
-        # Outlier alert box
-        outlier_html = ""
-        if len(outliers) > 0:
-            date_list = ", ".join(outlier_dates[:10])
-            more_flag = "" if len(outlier_dates) <= 10 else "…"
-            sample_values = ', '.join([f'{v:.4f}' for v in outliers[:5]])
-            outlier_html = f'''
-            <div class="bg-amber-50 border border-amber-200 rounded-xl p-5 mb-6">
-                <div class="flex items-start gap-3">
-                    <div class="flex-shrink-0">
-                        <svg class="w-6 h-6 text-amber-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path>
-                        </svg>
-                    </div>
-                    <div class="flex-1 min-w-0">
-                        <h4 class="text-base font-semibold text-amber-800 mb-2">Detected Outliers (±2 SD)</h4>
-                        <div class="space-y-1 text-sm text-amber-700">
-                            <p><span class="font-medium">Total outliers:</span> {len(outliers)}</p>
-                            <p><span class="font-medium">Sample values:</span> {sample_values}</p>
-                            <p><span class="font-medium">Dates:</span> {date_list}{more_flag}</p>
-                        </div>
-                    </div>
-                </div>
-            </div>
-            '''
-
-        # Breach alert box
-        breach_html = ""
-        if breaches:
-            breach_items = []
-            for breach in breaches:
-                label = "Max" if breach["type"] == "max" else "Min"
-                icon_color = "text-red-500" if breach["type"] == "max" else "text-orange-500"
-                date_str = ", ".join(breach["dates"][:10])
-                more_flag = "" if len(breach["dates"]) <= 10 else "…"
-                breach_items.append(f'''
-                    <li class="flex items-start gap-2">
-                        <svg class="w-5 h-5 {icon_color} flex-shrink-0 mt-0.5" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 8v4m0 4h.01M21 12a9 9 0 11-18 0 9 9 0 0118 0z"></path>
-                        </svg>
-                        <span><strong>{label} limit</strong> breached {breach['count']} times on {date_str}{more_flag}</span>
-                    </li>
-                ''')
-
-            breach_html = f'''
-            <div class="bg-red-50 border border-red-200 rounded-xl p-5 mb-6">
-                <div class="flex items-start gap-3">
-                    <div class="flex-shrink-0">
-                        <svg class="w-6 h-6 text-red-500" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M12 9v2m0 4h.01m-6.938 4h13.856c1.54 0 2.502-1.667 1.732-3L13.732 4c-.77-1.333-2.694-1.333-3.464 0L3.34 16c-.77 1.333.192 3 1.732 3z"></path>
-                        </svg>
-                    </div>
-                    <div class="flex-1 min-w-0">
-                        <h4 class="text-base font-semibold text-red-800 mb-3">Limit Breaches Detected</h4>
-                        <ul class="space-y-2 text-sm text-red-700">
-                            {''.join(breach_items)}
-                        </ul>
-                    </div>
-                </div>
-            </div>
-            '''
-
-        # AI insights section
-        insights_html = ""
-        if use_llm:
-            insight_text = (insights or "No AI insight generated.").replace(chr(10), '<br><br>')
-            insights_html = f'''
-            <div class="mt-8 bg-gradient-to-br from-blue-50 to-cyan-50 border border-blue-200 rounded-xl p-6">
-                <div class="flex items-center gap-3 mb-4">
-                    <div class="p-2 bg-blue-100 rounded-lg">
-                        <svg class="w-5 h-5 text-blue-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9.663 17h4.673M12 3v1m6.364 1.636l-.707.707M21 12h-1M4 12H3m3.343-5.657l-.707-.707m2.828 9.9a5 5 0 117.072 0l-.548.547A3.374 3.374 0 0014 18.469V19a2 2 0 11-4 0v-.531c0-.895-.356-1.754-.988-2.386l-.548-.547z"></path>
-                        </svg>
-                    </div>
-                    <h3 class="text-lg font-semibold text-blue-900">AI-Generated Insights</h3>
-                </div>
-                <div class="prose prose-sm max-w-none text-gray-700 leading-relaxed">
-                    {insight_text}
-                </div>
-            </div>
-            '''
-
-        metric_section = f'''
-        <article id="{anchor_id}" data-status="{status}" data-metric="{metric.lower()}"
-                 class="metric-card mb-10 bg-white border border-gray-200 {border} rounded-2xl shadow-lg overflow-hidden scroll-mt-32">
-            <!-- Metric Header -->
-            <div class="bg-gradient-to-r from-gray-50 to-white border-b border-gray-100 px-6 py-5 sm:px-8 sm:py-6">
-                <div class="flex flex-col sm:flex-row sm:items-center sm:justify-between gap-4">
-                    <div class="flex items-center gap-3">
-                        <div class="p-2 bg-blue-100 rounded-lg">
-                            <svg class="w-6 h-6 text-blue-600" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                                <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 19v-6a2 2 0 00-2-2H5a2 2 0 00-2 2v6a2 2 0 002 2h2a2 2 0 002-2zm0 0V9a2 2 0 012-2h2a2 2 0 012 2v10m-6 0a2 2 0 002 2h2a2 2 0 002-2m0 0V5a2 2 0 012-2h2a2 2 0 012 2v14a2 2 0 01-2 2h-2a2 2 0 01-2-2z"></path>
-                            </svg>
-                        </div>
-                        <h2 class="text-2xl sm:text-3xl font-bold text-gray-900">{metric}</h2>
-                    </div>
-                    <a href="#top" class="inline-flex items-center gap-2 px-4 py-2 bg-gray-100 hover:bg-gray-200 border border-gray-200 rounded-lg text-gray-600 hover:text-gray-800 transition-all text-sm font-medium focus:outline-none focus:ring-2 focus:ring-blue-500">
-                        <svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24">
-                            <path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M5 10l7-7m0 0l7 7m-7-7v18"></path>
-                        </svg>
-                        <span>Back to top</span>
-                    </a>
-                </div>
-            </div>
-            
-            <!-- Metric Content -->
-            <div class="p-6 sm:p-8">
-                <!-- Stats Grid -->
-                <div class="grid grid-cols-2 sm:grid-cols-3 lg:grid-cols-5 gap-4 mb-8">
-                    <div class="bg-slate-700 rounded-xl p-4 text-white shadow-md">
-                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">Mean</div>
-                        <div class="text-xl sm:text-2xl font-bold font-mono">{stats['mean']:.4f}</div>
-                    </div>
-                    <div class="bg-slate-700 rounded-xl p-4 text-white shadow-md">
-                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">Median</div>
-                        <div class="text-xl sm:text-2xl font-bold font-mono">{stats['median']:.4f}</div>
-                    </div>
-                    <div class="bg-slate-700 rounded-xl p-4 text-white shadow-md">
-                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">Std Dev</div>
-                        <div class="text-xl sm:text-2xl font-bold font-mono">{stats['std']:.4f}</div>
-                    </div>
-                    <div class="bg-slate-700 rounded-xl p-4 text-white shadow-md">
-                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">Min</div>
-                        <div class="text-xl sm:text-2xl font-bold font-mono">{stats['min']:.4f}</div>
-                    </div>
-                    <div class="bg-slate-700 rounded-xl p-4 text-white shadow-md col-span-2 sm:col-span-1">
-                        <div class="text-xs font-medium text-slate-300 uppercase tracking-wide mb-1">Max</div>
-                        <div class="text-xl sm:text-2xl font-bold font-mono">{stats['max']:.4f}</div>
-                    </div>
-                </div>
-                
-                <!-- Alerts -->
-                {outlier_html}
-                {breach_html}
-                {limit_annotation_html}
-                
-                <!-- Chart -->
-                <div class="bg-gray-50 rounded-xl p-4 border border-gray-100">
-                    {fig_html}
-                </div>
-                
-                <!-- AI Insights -->
-                {insights_html}
-            </div>
-        </article>
-        '''
-        metric_sections.append(metric_section)
+    # Anchors are computed once and shared by the TOC and the metric sections
+    # (priority sorted: VaR, SVaR, STTHH first)
+    anchor_ids = [make_anchor_id(analysis["metric"]) for analysis in metrics_analyses_sorted]
+    toc_items = [
+        _TOC_ITEM_TMPL.format(anchor_id=anchor_id, metric=analysis["metric"])
+        for analysis, anchor_id in zip(metrics_analyses_sorted, anchor_ids)
+    ]
 
     # Portfolio summary section
     portfolio_html = ""
@@ -495,36 +659,20 @@ def create_html_report(
         '''
 
     # Footer content
-    ai_status_badge = (
-        '<span class="inline-flex items-center gap-1.5 px-3 py-1 bg-emerald-100 text-emerald-700 rounded-full text-sm font-medium"><svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M9 12l2 2 4-4m6 2a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>AI Enabled</span>'
-        if use_llm
-        else '<span class="inline-flex items-center gap-1.5 px-3 py-1 bg-gray-100 text-gray-600 rounded-full text-sm font-medium"><svg class="w-4 h-4" fill="none" stroke="currentColor" viewBox="0 0 24 24"><path stroke-linecap="round" stroke-linejoin="round" stroke-width="2" d="M10 14l2-2m0 0l2-2m-2 2l-2-2m2 2l2 2m7-2a9 9 0 11-18 0 9 9 0 0118 0z"></path></svg>AI Disabled</span>'
-    )
-    disclaimer_text = "Generated by AI, use with caution." if use_llm else "Generated automatically, review before use."
+    ai_status_badge = _AI_ENABLED_BADGE if use_llm else _AI_DISABLED_BADGE
+    disclaimer_text = _AI_DISCLAIMER if use_llm else _AUTO_DISCLAIMER
 
     # Build excluded metrics section
     excluded_section_html = _build_excluded_metrics_section(excluded_by_keyword, excluded_by_limit)
 
-    html_content = f'''<!DOCTYPE html>
+    html_head = f'''<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="utf-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>Risk Metrics Analysis Report - {file_name}</title>
-    <script src="https://cdn.tailwindcss.com"></script>
-    <script src="https://cdn.plot.ly/plotly-2.35.2.min.js" charset="utf-8"></script>
-    <script>
-        tailwind.config = {{
-            theme: {{
-                extend: {{
-                    fontFamily: {{
-                        sans: ['Inter', 'system-ui', 'sans-serif'],
-                        mono: ['JetBrains Mono', 'Consolas', 'monospace'],
-                    }},
-                }}
-            }}
-        }}
-    </script>
+    {_TAILWIND_SCRIPT_TAGS}
+    {_PLOTLY_SCRIPT_TAG}
     <link rel="preconnect" href="https://fonts.googleapis.com">
     <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
     <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&family=JetBrains+Mono:wght@500;700&display=swap" rel="stylesheet">
@@ -646,7 +794,8 @@ def create_html_report(
         
         <!-- Metric Sections -->
         <main>
-            {''.join(metric_sections)}
+            '''
+    html_tail = f'''
         </main>
         
         <!-- Portfolio Summary -->
@@ -768,28 +917,51 @@ def create_html_report(
                 }}
             }});
 
-            // Lazy-render Plotly charts only when scrolled into view
-            const renderPlot = (specEl) => {{
-                if (specEl.dataset.rendered) return;
-                const target = document.getElementById(specEl.dataset.target);
-                if (!target) return;
+            // Lazy-render Plotly charts when their container nears the viewport.
+            // The JSON spec <script> is never laid out, so the visible plot div is
+            // observed; charts are drawn from a queue during browser idle time.
+            const plotConfig = {_PLOTLY_CONFIG_JSON};
+            const plotSpecs = {{}};
+            document.querySelectorAll('.plot-spec').forEach(el => {{ plotSpecs[el.dataset.target] = el; }});
+            const renderPlot = (plotEl) => {{
+                if (plotEl.dataset.rendered) return;
+                const specEl = plotSpecs[plotEl.id];
+                if (!specEl) return;
                 const spec = JSON.parse(specEl.textContent);
-                Plotly.newPlot(target, spec.data, spec.layout, {{responsive: true, displayModeBar: false}});
-                specEl.dataset.rendered = "1";
+                Plotly.newPlot(plotEl, spec.data, spec.layout, plotConfig);
+                plotEl.dataset.rendered = "1";
+            }};
+            const scheduleIdle = window.requestIdleCallback
+                || ((cb) => setTimeout(() => cb({{timeRemaining: () => 0}}), 1));
+            const pendingPlots = [];
+            let idleScheduled = false;
+            const drainPlots = (deadline) => {{
+                do {{
+                    renderPlot(pendingPlots.shift());
+                }} while (pendingPlots.length && deadline.timeRemaining() > 0);
+                idleScheduled = pendingPlots.length > 0;
+                if (idleScheduled) scheduleIdle(drainPlots, {{timeout: 500}});
+            }};
+            const queuePlot = (plotEl) => {{
+                pendingPlots.push(plotEl);
+                if (!idleScheduled) {{
+                    idleScheduled = true;
+                    scheduleIdle(drainPlots, {{timeout: 500}});
+                }}
             }};
             const plotObserver = new IntersectionObserver((entries) => {{
                 entries.forEach(entry => {{
                     if (entry.isIntersecting) {{
-                        renderPlot(entry.target);
+                        queuePlot(entry.target);
                         plotObserver.unobserve(entry.target);
                     }}
                 }});
             }}, {{rootMargin: "200px"}});
-            document.querySelectorAll('.plot-spec').forEach(el => plotObserver.observe(el));
+            document.querySelectorAll('.lazy-plot').forEach(el => plotObserver.observe(el));
 
             // Render every chart before printing so off-screen charts are not blank in PDF/print
             window.addEventListener('beforeprint', () => {{
-                document.querySelectorAll('.plot-spec').forEach(renderPlot);
+                document.querySelectorAll('.lazy-plot').forEach(renderPlot);
             }});
 
             // Filter metric cards by status chip + search text
@@ -819,7 +991,204 @@ def create_html_report(
 </body>
 </html>'''
 
-    return html_content
+    # Sections are rendered one at a time so callers can stream the report
+    yield html_head
+    for analysis, anchor_id in zip(metrics_analyses_sorted, anchor_ids):
+        yield _render_metric_section(analysis, anchor_id, use_llm, shared_fig_jsons)
+    yield html_tail
+
+
+def _start_kaleido_server() -> None:
+    """Keep one Kaleido browser alive in this process for all following renders.
+
+    Used as the PNG pool initializer. Kaleido >= 1.0 otherwise starts and
+    tears down Chromium for every ``pio.to_image`` call; older Kaleido builds
+    without a sync server keep their per-call behaviour.
+    """
+    try:
+        import kaleido
+    except ImportError:
+        return
+    start_sync_server = getattr(kaleido, "start_sync_server", None)
+    if start_sync_server is not None:
+        start_sync_server(silence_warnings=True)
+
+
+def _render_png(fig_json: str) -> bytes:
+    """Rasterise a JSON-serialised Plotly figure to PNG bytes.
+
+    Runs in the export process pool, so it takes the figure as JSON, which
+    crosses the process boundary far more cheaply than a pickled Figure.
+    """
+    return pio.to_image(pio.from_json(fig_json), **_PNG_EXPORT_OPTIONS)
+
+
+def _bounded_map(executor: Executor, fn: Callable[[Any], Any], items: Iterable[Any], window: int) -> Iterator[Any]:
+    """Like ``executor.map``, but with at most ``window`` calls in flight.
+
+    Results are yielded in input order, and a further item is only taken from
+    ``items`` once an earlier result has been consumed, so neither the inputs
+    nor the results are all held in memory at once.
+    """
+    items = iter(items)
+    pending = deque(executor.submit(fn, item) for item in islice(items, window))
+    while pending:
+        result = pending.popleft().result()
+        for item in islice(items, 1):
+            pending.append(executor.submit(fn, item))
+        yield result
+
+
+@contextmanager
+def _background_pngs(fig_jsons: Iterable[str]) -> Iterator[Iterator[bytes]]:
+    """Render chart PNGs for the export packages while the caller keeps working.
+
+    Figures are rendered in a process pool, with workers that each reuse one
+    Kaleido browser, so the caller can write other archive members while the
+    charts render. A small window of figures is kept in flight ahead of the
+    consumer. A single figure is rendered inline, on demand.
+
+    Args:
+        fig_jsons: JSON-serialised Plotly figures to rasterise; may be lazy.
+
+    Yields:
+        An iterator over the PNG bytes, in the same order as ``fig_jsons``.
+    """
+    fig_jsons = iter(fig_jsons)
+    head = list(islice(fig_jsons, 2))
+    if len(head) < 2:
+        yield map(_render_png, head)
+        return
+
+    max_workers = os.cpu_count() or 1
+    with ProcessPoolExecutor(
+        max_workers=max_workers, mp_context=_PNG_MP_CONTEXT, initializer=_start_kaleido_server
+    ) as executor:
+        yield _bounded_map(executor, _render_png, chain(head, fig_jsons), window=2 * max_workers)
+
+
+def _shared_fig_jsons(metrics_analyses: List[dict]) -> Dict[str, Optional[str]]:
+    """Return the JSON hand-off map for figures both the HTML report and the PNGs use as-is.
+
+    Only figures that neither export downsamples are listed; see
+    :func:`_take_fig_json`. Every other figure is serialised by each consumer
+    from its own downsampled copy.
+    """
+    max_points = min(MAX_CHART_POINTS, _PNG_MAX_POINTS)
+    return {
+        analysis["metric"]: None
+        for analysis in metrics_analyses
+        if not needs_downsampling(analysis["fig"], max_points)
+    }
+
+
+def _take_fig_json(fig: go.Figure, metric: str, shared_fig_jsons: Optional[Dict[str, Optional[str]]]) -> str:
+    """Serialise ``fig``, sharing the JSON of a metric listed in ``shared_fig_jsons``.
+
+    The first of the two consumers serialises the figure and leaves the JSON
+    in the map; the second takes it out again, so it is held only until both
+    exports have used it.
+    """
+    if shared_fig_jsons is None or metric not in shared_fig_jsons:
+        return fig.to_json()
+    fig_json = shared_fig_jsons[metric]
+    if fig_json is None:
+        fig_json = shared_fig_jsons[metric] = fig.to_json()
+    else:
+        del shared_fig_jsons[metric]
+    return fig_json
+
+
+def _png_figure_jsons(
+    metrics_analyses: List[dict],
+    shared_fig_jsons: Optional[Dict[str, Optional[str]]] = None,
+) -> Iterator[str]:
+    """Yield the figure JSON to rasterise for each metric, in analysis order.
+
+    Line traces longer than the image width are LTTB-downsampled first. Figures
+    are serialised one at a time, as the PNG pool takes them.
+    """
+    for analysis in metrics_analyses:
+        fig = downsample_figure(analysis["fig"], _PNG_MAX_POINTS)
+        yield _take_fig_json(fig, analysis["metric"], shared_fig_jsons)
+
+
+def _write_zip_entry(
+    zip_file: zipfile.ZipFile,
+    arcname: str,
+    data: Union[str, bytes, Iterable[str]],
+    compress_type: Optional[int] = None,
+) -> None:
+    """Add ``data`` to the archive as a new member.
+
+    Text and bytes are written with a single ``writestr`` call. An iterable of
+    text chunks is spooled to a temporary file as it is produced and added
+    with ``ZipFile.write``, which reads it back in small blocks, so the whole
+    member never has to be held in memory. Both calls apply the archive's
+    compression level on every supported Python version.
+
+    Args:
+        zip_file: Archive opened in write mode.
+        arcname: Path of the member inside the archive.
+        data: Member content, or an iterable of text chunks (such as
+            :func:`iter_html_report`); text is encoded as UTF-8.
+        compress_type: Per-member override of the archive's compression,
+            e.g. ``zipfile.ZIP_STORED`` for already-compressed images.
+    """
+    if isinstance(data, (str, bytes)):
+        zip_file.writestr(arcname, data, compress_type=compress_type)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        member_path = os.path.join(tmp_dir, "member")
+        with open(member_path, "w", encoding="utf-8", newline="") as member:
+            member.writelines(data)
+        zip_file.write(member_path, arcname, compress_type=compress_type)
+
+
+def _summary_metric_block(analysis: dict, use_llm: bool) -> str:
+    """Render one metric's statistics, breaches and insights for summary.txt."""
+    breach_text = ""
+    if analysis["breaches"]:
+        formatted = [
+            _SUMMARY_BREACH_LINE_TMPL.format(
+                label="Max" if breach["type"] == "max" else "Min",
+                count=breach["count"],
+                dates=", ".join(breach["dates"]),
+            )
+            for breach in analysis["breaches"]
+        ]
+        breach_text = "\n\nLimit Breaches:\n" + "\n".join(formatted)
+
+    block = _SUMMARY_METRIC_TMPL.format(
+        metric=analysis["metric"], sep=_SUMMARY_SEP, stats=analysis["stats"], breach_text=breach_text
+    )
+    if use_llm:
+        return block + _SUMMARY_INSIGHTS_TMPL.format(
+            insights=analysis["insights"] or "No AI insight generated.", sep=_SUMMARY_SEP
+        )
+    return block + _SUMMARY_METRIC_END
+
+
+def _write_chart_pngs(
+    zip_file: zipfile.ZipFile,
+    folder: str,
+    metrics_analyses: List[dict],
+    png_images: Iterator[bytes],
+) -> None:
+    """Store one rendered PNG per metric under ``folder``/charts/ in the archive.
+
+    ``png_images`` yields the PNGs in analysis order and may be shared across
+    several calls; only as many images as there are analyses are consumed.
+    """
+    for analysis, img_bytes in zip(metrics_analyses, png_images):
+        safe_metric = sanitize_node_name(analysis["metric"])
+        _write_zip_entry(
+            zip_file,
+            f"{folder}charts/{safe_metric}_chart.png",
+            img_bytes,
+            compress_type=zipfile.ZIP_STORED,
+        )
 
 
 def create_export_package(
@@ -830,93 +1199,90 @@ def create_export_package(
     excluded_by_keyword: Optional[List[str]] = None,
     excluded_by_limit: Optional[List[str]] = None,
     long_dataset_csv: Optional[str] = None,
-) -> BytesIO:
-    """Create a ZIP archive containing the report, charts, and summary text."""
-    html_content = create_html_report(
-        metrics_analyses,
-        portfolio_summary,
-        file_name,
-        use_llm,
-        excluded_by_keyword=excluded_by_keyword,
-        excluded_by_limit=excluded_by_limit,
-    )
+    html_content: Optional[str] = None,
+    out_stream: Optional[IO[bytes]] = None,
+    include_png_charts: bool = False,
+) -> IO[bytes]:
+    """Create a ZIP archive containing the report, summary text and, optionally, chart PNGs.
+    
+    The HTML report already carries every chart interactively, so the PNGs,
+    which need a Kaleido render per metric, are only added on request.
+    
+    Args:
+        metrics_analyses: List of metric analysis dictionaries.
+        portfolio_summary: AI-generated portfolio summary.
+        file_name: Original source file name.
+        use_llm: Whether LLM analysis was enabled.
+        excluded_by_keyword: List of metrics excluded by user keyword filter.
+        excluded_by_limit: List of metrics excluded by limit filter.
+        long_dataset_csv: Optional Power BI dataset CSV to include.
+        html_content: Report already produced by :func:`create_html_report` for
+            the same inputs; rendered here when omitted.
+        out_stream: Writable binary stream to build the archive in, e.g. a
+            ``tempfile.SpooledTemporaryFile`` or an open file for exports too
+            large to hold in memory. A new BytesIO is used when omitted.
+        include_png_charts: Whether to render each chart to ``charts/*.png``.
+        
+    Returns:
+        The stream containing the ZIP archive, rewound to the start.
+    """
+    # Figures drawn unchanged in both the report and the PNGs are serialised once
+    shared_fig_jsons = None
+    if html_content is None and include_png_charts:
+        shared_fig_jsons = _shared_fig_jsons(metrics_analyses)
+    html_member: Union[str, Iterator[str]] = html_content
+    if html_member is None:
+        # Stream the report into the archive section by section
+        html_member = iter_html_report(
+            metrics_analyses,
+            portfolio_summary,
+            file_name,
+            use_llm,
+            excluded_by_keyword=excluded_by_keyword,
+            excluded_by_limit=excluded_by_limit,
+            shared_fig_jsons=shared_fig_jsons,
+        )
 
-    zip_buffer = BytesIO()
+    zip_buffer = BytesIO() if out_stream is None else out_stream
 
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-        zip_file.writestr("risk_analysis_report.html", html_content)
+    # Charts render in the pool while the report is written; the archive
+    # itself is written from this thread only
+    png_jsons = _png_figure_jsons(metrics_analyses, shared_fig_jsons) if include_png_charts else []
+    with _background_pngs(png_jsons) as png_images, zipfile.ZipFile(
+        zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_TEXT_COMPRESSLEVEL
+    ) as zip_file:
+        _write_zip_entry(zip_file, "risk_analysis_report.html", html_member)
         if long_dataset_csv:
-            zip_file.writestr("powerbi_dataset.csv", long_dataset_csv)
+            _write_zip_entry(zip_file, "powerbi_dataset.csv", long_dataset_csv)
 
-        for analysis in metrics_analyses:
-            metric = analysis["metric"]
-            fig = analysis["fig"]
-            img_bytes = pio.to_image(fig, format="png", width=1200, height=600, scale=2)
-            zip_file.writestr(f"charts/{metric.replace('/', '_')}_chart.png", img_bytes)
+        if include_png_charts:
+            _write_chart_pngs(zip_file, "", metrics_analyses, png_images)
 
-        summary_text = f"""Risk Metrics Analysis Summary
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        # Collect fragments and join once; repeated += on a str is quadratic
+        generated_at = datetime.now().strftime(_TIMESTAMP_FORMAT)
+        summary_parts = [f"""Risk Metrics Analysis Summary
+Generated: {generated_at}
 Source File: {file_name}
 Metrics Analyzed: {', '.join([a['metric'] for a in metrics_analyses])}
-AI Analysis Mode: {'Enabled (Google Gemini)' if use_llm else 'Disabled'}
-
-{'='*80}
-
-"""
-
-        for analysis in metrics_analyses:
-            metric = analysis["metric"]
-            stats = analysis["stats"]
-            insights = analysis["insights"]
-            breaches = analysis["breaches"]
-
-            breach_text = ""
-            if breaches:
-                formatted = []
-                for breach in breaches:
-                    label = "Max" if breach["type"] == "max" else "Min"
-                    date_str = ", ".join(breach["dates"])
-                    formatted.append(f"  - {label} limit breached {breach['count']} times on {date_str}")
-                breach_text = "\n\nLimit Breaches:\n" + "\n".join(formatted)
-
-            summary_text += f"""
-{metric} ANALYSIS
-{'='*80}
-
-Statistics:
-- Mean: {stats['mean']:.4f}
-- Median: {stats['median']:.4f}
-- Standard Deviation: {stats['std']:.4f}
-- Min: {stats['min']:.4f}
-- Max: {stats['max']:.4f}{breach_text}
-
-"""
+AI Analysis Mode: {_AI_MODE_LABELS[bool(use_llm)]}
 
-            if use_llm:
-                summary_text += f"""
+{_SUMMARY_SEP}
 
-AI Insights:
-{insights or 'No AI insight generated.'}
-
-{'='*80}
-
-"""
-            else:
-                summary_text += f"""
+"""]
 
-{'='*80}
-
-"""
+        summary_parts.extend(
+            _summary_metric_block(analysis, use_llm) for analysis in metrics_analyses
+        )
 
         if use_llm and portfolio_summary:
-            summary_text += f"""
+            summary_parts.append(f"""
 RISK PORTFOLIO SUMMARY
-{'='*80}
+{_SUMMARY_SEP}
 
 {portfolio_summary}
-"""
+""")
 
-        zip_file.writestr("summary.txt", summary_text)
+        _write_zip_entry(zip_file, "summary.txt", "".join(summary_parts))
 
     zip_buffer.seek(0)
     return zip_buffer
@@ -930,14 +1296,18 @@ def create_batch_export_package(
     excluded_by_keyword: Optional[List[str]] = None,
     excluded_by_limit: Optional[List[str]] = None,
     long_dataset_csv: Optional[str] = None,
-) -> BytesIO:
+    out_stream: Optional[IO[bytes]] = None,
+    include_png_charts: bool = False,
+) -> IO[bytes]:
     """Create a ZIP archive with node-folder structure for batch mode exports.
     
     Creates a folder structure where each node has its own subdirectory containing:
     - report.html: The HTML report for that node
-    - charts/: Directory with PNG images for each metric
+    - charts/: Directory with PNG images for each metric (only with ``include_png_charts``)
     - summary.txt: Text summary of the analysis
     
+    Use :func:`create_batch_png_charts` to export the PNGs on their own.
+    
     Args:
         batch_results: Dictionary mapping node names to their metrics_analyses lists.
         batch_portfolio_summaries: Dictionary mapping node names to portfolio summaries.
@@ -945,134 +1315,153 @@ def create_batch_export_package(
         use_llm: Whether LLM analysis was enabled.
         excluded_by_keyword: List of metrics excluded by user keyword filter.
         excluded_by_limit: List of metrics excluded by limit filter.
+        long_dataset_csv: Optional Power BI dataset CSV to include.
+        out_stream: Writable binary stream to build the archive in; a new
+            BytesIO is used when omitted.
+        include_png_charts: Whether to render each node's charts to PNG.
         
     Returns:
-        BytesIO buffer containing the ZIP archive.
+        The stream containing the ZIP archive, rewound to the start.
     """
     # Default to empty lists if not provided
     excluded_by_keyword = excluded_by_keyword or []
     excluded_by_limit = excluded_by_limit or []
     
-    zip_buffer = BytesIO()
-
-    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+    # One timestamp for every node summary in the archive
+    generated_at = datetime.now().strftime(_TIMESTAMP_FORMAT)
+    zip_buffer = BytesIO() if out_stream is None else out_stream
+
+    # Figures drawn unchanged in a node's report and PNGs are serialised once
+    node_fig_jsons = {
+        node_name: _shared_fig_jsons(metrics_analyses) if include_png_charts else None
+        for node_name, metrics_analyses in batch_results.items()
+    }
+    # Every node's charts go through one pool: the Kaleido workers start once
+    # per export, and later nodes render while earlier ones are written
+    png_jsons = (
+        png_json
+        for node_name, metrics_analyses in batch_results.items()
+        for png_json in _png_figure_jsons(metrics_analyses, node_fig_jsons[node_name])
+    ) if include_png_charts else ()
+
+    with _background_pngs(png_jsons) as png_iter, zipfile.ZipFile(
+        zip_buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=_ZIP_TEXT_COMPRESSLEVEL
+    ) as zip_file:
         if long_dataset_csv:
-            zip_file.writestr("powerbi_dataset.csv", long_dataset_csv)
+            _write_zip_entry(zip_file, "powerbi_dataset.csv", long_dataset_csv)
 
         for node_name, metrics_analyses in batch_results.items():
             safe_node_name = sanitize_node_name(node_name)
             portfolio_summary = batch_portfolio_summaries.get(node_name, "")
             
             # Generate HTML report for this node
-            html_content = create_html_report(
+            html_chunks = iter_html_report(
                 metrics_analyses, 
                 portfolio_summary, 
                 f"{file_name} - {node_name}", 
                 use_llm,
                 excluded_by_keyword=excluded_by_keyword,
                 excluded_by_limit=excluded_by_limit,
+                shared_fig_jsons=node_fig_jsons[node_name],
             )
-            zip_file.writestr(f"{safe_node_name}/report.html", html_content)
+            _write_zip_entry(zip_file, f"{safe_node_name}/report.html", html_chunks)
             
-            # Generate chart images
-            for analysis in metrics_analyses:
-                metric = analysis["metric"]
-                fig = analysis["fig"]
-                img_bytes = pio.to_image(fig, format="png", width=1200, height=600, scale=2)
-                safe_metric = metric.replace('/', '_')
-                zip_file.writestr(
-                    f"{safe_node_name}/charts/{safe_metric}_chart.png", 
-                    img_bytes
-                )
+            # Chart images, consumed in the order they are queued above;
+            # later nodes keep rendering while this one is written
+            if include_png_charts:
+                _write_chart_pngs(zip_file, f"{safe_node_name}/", metrics_analyses, png_iter)
             
             # Generate summary text
             summary_text = _create_node_summary_text(
-                node_name, metrics_analyses, portfolio_summary, file_name, use_llm
+                node_name, metrics_analyses, portfolio_summary, file_name, use_llm, generated_at
             )
-            zip_file.writestr(f"{safe_node_name}/summary.txt", summary_text)
+            _write_zip_entry(zip_file, f"{safe_node_name}/summary.txt", summary_text)
     
     zip_buffer.seek(0)
     return zip_buffer
 
 
+def create_batch_png_charts(
+    batch_results: Dict[str, List[dict]],
+    out_stream: Optional[IO[bytes]] = None,
+) -> IO[bytes]:
+    """Create a ZIP archive holding only the chart PNGs of a batch run.
+    
+    Uses the same ``<node>/charts/<metric>_chart.png`` layout as
+    :func:`create_batch_export_package`, so the two archives can be merged.
+    
+    Args:
+        batch_results: Dictionary mapping node names to their metrics_analyses lists.
+        out_stream: Writable binary stream to build the archive in; a new
+            BytesIO is used when omitted.
+        
+    Returns:
+        The stream containing the ZIP archive, rewound to the start.
+    """
+    zip_buffer = BytesIO() if out_stream is None else out_stream
+    png_jsons = (
+        png_json
+        for metrics_analyses in batch_results.values()
+        for png_json in _png_figure_jsons(metrics_analyses)
+    )
+
+    with _background_pngs(png_jsons) as png_iter, zipfile.ZipFile(
+        zip_buffer, "w", zipfile.ZIP_STORED
+    ) as zip_file:
+        for node_name, metrics_analyses in batch_results.items():
+            _write_chart_pngs(zip_file, f"{sanitize_node_name(node_name)}/", metrics_analyses, png_iter)
+
+    zip_buffer.seek(0)
+    return zip_buffer
+
+
 def _create_node_summary_text(
     node_name: str,
     metrics_analyses: List[dict],
     portfolio_summary: str,
     file_name: str,
     use_llm: bool,
+    generated_at: Optional[str] = None,
 ) -> str:
-    """Create the summary text file content for a single node."""
-    summary_text = f"""Risk Metrics Analysis Summary - {node_name}
-Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+    """Create the summary text file content for a single node.
+    
+    ``generated_at`` is the formatted export timestamp shared by every node;
+    the current time is used when it is omitted.
+    """
+    generated_at = generated_at or datetime.now().strftime(_TIMESTAMP_FORMAT)
+    # Collect fragments and join once; repeated += on a str is quadratic
+    summary_parts = [f"""Risk Metrics Analysis Summary - {node_name}
+Generated: {generated_at}
 Source File: {file_name}
 Node: {node_name}
 Metrics Analyzed: {', '.join([a['metric'] for a in metrics_analyses])}
-AI Analysis Mode: {'Enabled (Google Gemini)' if use_llm else 'Disabled'}
+AI Analysis Mode: {_AI_MODE_LABELS[bool(use_llm)]}
 
-{'='*80}
+{_SUMMARY_SEP}
 
-"""
+"""]
 
-    for analysis in metrics_analyses:
-        metric = analysis["metric"]
-        stats = analysis["stats"]
-        insights = analysis["insights"]
-        breaches = analysis["breaches"]
-
-        breach_text = ""
-        if breaches:
-            formatted = []
-            for breach in breaches:
-                label = "Max" if breach["type"] == "max" else "Min"
-                date_str = ", ".join(breach["dates"])
-                formatted.append(f"  - {label} limit breached {breach['count']} times on {date_str}")
-            breach_text = "\n\nLimit Breaches:\n" + "\n".join(formatted)
-
-        summary_text += f"""
-{metric} ANALYSIS
-{'='*80}
-
-Statistics:
-- Mean: {stats['mean']:.4f}
-- Median: {stats['median']:.4f}
-- Standard Deviation: {stats['std']:.4f}
-- Min: {stats['min']:.4f}
-- Max: {stats['max']:.4f}{breach_text}
-
-"""
-
-        if use_llm:
-            summary_text += f"""
-
-AI Insights:
-{insights or 'No AI insight generated.'}
-
-{'='*80}
-
-"""
-        else:
-            summary_text += f"""
-
-{'='*80}
-
-"""
+    summary_parts.extend(
+        _summary_metric_block(analysis, use_llm) for analysis in metrics_analyses
+    )
 
     if use_llm and portfolio_summary:
-        summary_text += f"""
+        summary_parts.append(f"""
 RISK PORTFOLIO SUMMARY - {node_name}
-{'='*80}
+{_SUMMARY_SEP}
 
 {portfolio_summary}
-"""
+""")
 
-    return summary_text
+    return "".join(summary_parts)
 
 
 __all__ = [
     "create_batch_export_package",
+    "create_batch_png_charts",
     "create_export_package",
     "create_html_report",
+    "iter_html_report",
     "kpi_counts",
     "make_anchor_id",
     "metric_status",
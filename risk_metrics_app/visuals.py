@@ -3,6 +3,7 @@ import os
 from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import plotly.io as pio
@@ -10,6 +11,35 @@ import plotly.io as pio
 from .config import ADAPTIVE_SCALE_THRESHOLD, OUTPUT_DIR, logger
 from .metrics import VALUE_DATE_COLUMN, InterpolatedSeries
 
+# Chart styling shared by every metric figure; plotly copies these on assignment
+_BASE_LAYOUT = dict(
+    xaxis_title="Date",
+    hovermode="x unified",
+    template="plotly_white",
+    height=500,
+    showlegend=False,
+)
+_DATA_LINE = dict(color="#1f77b4", width=2)
+_MEAN_LINE = dict(color="green", width=2, dash="dash")
+_MEDIAN_LINE = dict(color="orange", width=2, dash="dot")
+_LIMIT_LINE = dict(color="red", width=2, dash="dashdot")
+_OUTLIER_MARKER = dict(color="red", size=10, symbol="circle-open", line=dict(width=2))
+
+# Markup for the off-screen limit banner; only the slots are filled per metric
+_LIMIT_BANNER_OPEN = (
+    '<div style="background-color: #fff3cd; border: 1px solid #ffc107; '
+    'border-radius: 4px; padding: 10px; margin: 10px 0;">'
+)
+_LIMIT_CONSUMPTION_TMPL = (
+    "<strong>✅ Metric consumption is less than {pct:.1f}% of the limit range with no breaches.</strong><br/>"
+)
+_LIMIT_BANNER_HEADING = (
+    "<strong>📊 Limit Values (not shown on chart - adaptive scaling applied):</strong>\n"
+    '<ul style="margin: 5px 0; padding-left: 20px;">'
+)
+_LIMIT_ITEM_TMPL = "<li><strong>{start:%Y-%m-%d} to {end:%Y-%m-%d}:</strong> {limits}</li>"
+_LIMIT_BANNER_CLOSE = "</ul></div>"
+
 
 @dataclass
 class LimitPeriod:
@@ -50,6 +80,7 @@ def calculate_scale_context(
     dates: pd.Series,
     max_limit: Optional[pd.Series] = None,
     min_limit: Optional[pd.Series] = None,
+    date_vals: Optional[np.ndarray] = None,
 ) -> ScaleContext:
     """Calculate whether adaptive scaling is needed and gather limit period info.
     
@@ -61,6 +92,9 @@ def calculate_scale_context(
         dates: The date series for grouping limit periods.
         max_limit: Optional series of maximum limit values.
         min_limit: Optional series of minimum limit values.
+        date_vals: ``dates`` already converted to a datetime64 array. Callers
+            scaling several metrics over the same dates convert them once and
+            pass them here; otherwise they are converted on each call.
         
     Returns:
         ScaleContext with scaling decision and limit period information.
@@ -96,7 +130,9 @@ def calculate_scale_context(
     needs_scaling = has_limits and scale_ratio < ADAPTIVE_SCALE_THRESHOLD
     
     # Build limit periods for annotation
-    limit_periods = _build_limit_periods(dates, max_limit, min_limit)
+    if date_vals is None:
+        date_vals = pd.to_datetime(dates).to_numpy()
+    limit_periods = _build_limit_periods(date_vals, max_limit, min_limit)
     
     return ScaleContext(
         needs_adaptive_scaling=needs_scaling,
@@ -108,55 +144,46 @@ def calculate_scale_context(
 
 
 def _build_limit_periods(
-    dates: pd.Series,
+    date_vals: np.ndarray,
     max_limit: Optional[pd.Series],
     min_limit: Optional[pd.Series],
 ) -> List[LimitPeriod]:
     """Build a list of LimitPeriod objects grouped by changing limit values.
     
-    Groups consecutive dates with the same limit values into periods.
+    Groups consecutive dates with the same limit values into periods. Runs are
+    found with a vectorised comparison, so the Python work scales with the
+    number of periods rather than the number of dates. ``date_vals`` holds the
+    datetime64 value date of each row.
     """
-    if dates.empty:
+    n = len(date_vals)
+    if n == 0 or (max_limit is None and min_limit is None):
         return []
-    
-    periods: List[LimitPeriod] = []
-    
-    # Get limit values aligned with dates
-    max_vals = max_limit.values if max_limit is not None else [None] * len(dates)
-    min_vals = min_limit.values if min_limit is not None else [None] * len(dates)
-    date_vals = pd.to_datetime(dates).values
-    
-    current_start = date_vals[0]
-    current_max = max_vals[0] if max_vals[0] is not None and not pd.isna(max_vals[0]) else None
-    current_min = min_vals[0] if min_vals[0] is not None and not pd.isna(min_vals[0]) else None
-    
-    for i in range(1, len(dates)):
-        this_max = max_vals[i] if max_vals[i] is not None and not pd.isna(max_vals[i]) else None
-        this_min = min_vals[i] if min_vals[i] is not None and not pd.isna(min_vals[i]) else None
-        
-        # Check if limit values changed
-        if this_max != current_max or this_min != current_min:
-            # Save current period
-            if current_max is not None or current_min is not None:
-                periods.append(LimitPeriod(
-                    start_date=pd.Timestamp(current_start),
-                    end_date=pd.Timestamp(date_vals[i - 1]),
-                    max_limit=current_max,
-                    min_limit=current_min,
-                ))
-            # Start new period
-            current_start = date_vals[i]
-            current_max = this_max
-            current_min = this_min
-    
-    # Don't forget the last period
-    if current_max is not None or current_min is not None:
-        periods.append(LimitPeriod(
-            start_date=pd.Timestamp(current_start),
-            end_date=pd.Timestamp(date_vals[-1]),
-            max_limit=current_max,
-            min_limit=current_min,
-        ))
+
+    # NaN is the "no limit" sentinel, and a NaN run counts as one unchanged value
+    max_vals = np.full(n, np.nan) if max_limit is None else np.asarray(max_limit, dtype=float)
+    min_vals = np.full(n, np.nan) if min_limit is None else np.asarray(min_limit, dtype=float)
+    max_missing = np.isnan(max_vals)
+    min_missing = np.isnan(min_vals)
+    max_same = (max_vals[1:] == max_vals[:-1]) | (max_missing[1:] & max_missing[:-1])
+    min_same = (min_vals[1:] == min_vals[:-1]) | (min_missing[1:] & min_missing[:-1])
+
+    starts = np.flatnonzero(np.concatenate(([True], ~(max_same & min_same))))
+    ends = np.append(starts[1:] - 1, n - 1)
+    # Runs without any limit produce no period
+    limited = ~(max_missing[starts] & min_missing[starts])
+    starts, ends = starts[limited], ends[limited]
+
+    period_max = np.where(max_missing[starts], None, max_vals[starts]).tolist()
+    period_min = np.where(min_missing[starts], None, min_vals[starts]).tolist()
+    periods = [
+        LimitPeriod(
+            start_date=pd.Timestamp(date_vals[start]),
+            end_date=pd.Timestamp(date_vals[end]),
+            max_limit=max_value,
+            min_limit=min_value,
+        )
+        for start, end, max_value, min_value in zip(starts, ends, period_max, period_min)
+    ]
     
     return periods
 
@@ -174,31 +201,24 @@ def create_limit_annotation_html(scale_context: ScaleContext, has_breaches: bool
     if not scale_context.limit_periods:
         return ""
     
-    # Calculate consumption percentage (scale_ratio represents data_range / limit_range)
-    consumption_pct = scale_context.scale_ratio * 100
-    
-    lines = ['<div style="background-color: #fff3cd; border: 1px solid #ffc107; '
-             'border-radius: 4px; padding: 10px; margin: 10px 0;">']
+    lines = [_LIMIT_BANNER_OPEN]
     
-    # Add consumption remark if no breaches
+    # Add consumption remark if no breaches (scale_ratio is data_range / limit_range)
     if not has_breaches:
-        lines.append(f'<strong>✅ Metric consumption is less than {consumption_pct:.1f}% of the limit range with no breaches.</strong><br/>')
-    
-    lines.append('<strong>📊 Limit Values (not shown on chart - adaptive scaling applied):</strong>')
-    lines.append('<ul style="margin: 5px 0; padding-left: 20px;">')
+        lines.append(_LIMIT_CONSUMPTION_TMPL.format(pct=scale_context.scale_ratio * 100))
     
+    lines.append(_LIMIT_BANNER_HEADING)
     for period in scale_context.limit_periods:
-        date_range = f"{period.start_date.strftime('%Y-%m-%d')} to {period.end_date.strftime('%Y-%m-%d')}"
-        limits_text = []
-        if period.max_limit is not None:
-            limits_text.append(f"Max: {period.max_limit:,.2f}")
-        if period.min_limit is not None:
-            limits_text.append(f"Min: {period.min_limit:,.2f}")
-        
-        if limits_text:
-            lines.append(f'<li><strong>{date_range}:</strong> {" | ".join(limits_text)}</li>')
-    
-    lines.append('</ul></div>')
+        if period.max_limit is None and period.min_limit is None:
+            continue
+        if period.min_limit is None:
+            limits = f"Max: {period.max_limit:,.2f}"
+        elif period.max_limit is None:
+            limits = f"Min: {period.min_limit:,.2f}"
+        else:
+            limits = f"Max: {period.max_limit:,.2f} | Min: {period.min_limit:,.2f}"
+        lines.append(_LIMIT_ITEM_TMPL.format(start=period.start_date, end=period.end_date, limits=limits))
+    lines.append(_LIMIT_BANNER_CLOSE)
     
     return '\n'.join(lines)
 
@@ -226,6 +246,8 @@ def create_plotly_chart(
         display_series: Optional InterpolatedSeries for gap-filled display.
     """
     fig = go.Figure()
+    # Look the date column up once; every line trace shares it as its x values
+    x_vals = df[VALUE_DATE_COLUMN].to_numpy()
 
     # Use interpolated display series if provided, otherwise use original data
     if display_series is not None:
@@ -235,31 +257,35 @@ def create_plotly_chart(
 
     fig.add_trace(
         go.Scatter(
-            x=df[VALUE_DATE_COLUMN],
+            x=x_vals,
             y=y_data,
             mode="lines",
             name=f"{metric_name}",
-            line=dict(color="#1f77b4", width=2),
+            line=_DATA_LINE,
         )
     )
 
+    # Mean and median are flat lines, so the first and last dates are enough to
+    # draw them; the dates need not be sorted
+    x_min, x_max = pd.Series(x_vals).agg(["min", "max"])  # NaT-aware
+    x_ends = [x_min, x_max] if pd.notna(x_min) else []
     fig.add_trace(
         go.Scatter(
-            x=df[VALUE_DATE_COLUMN],
-            y=[stats["mean"]] * len(df),
+            x=x_ends,
+            y=[stats["mean"]] * len(x_ends),
             mode="lines",
             name=f"Mean ({stats['mean']:.4f})",
-            line=dict(color="green", width=2, dash="dash"),
+            line=_MEAN_LINE,
         )
     )
 
     fig.add_trace(
         go.Scatter(
-            x=df[VALUE_DATE_COLUMN],
-            y=[stats["median"]] * len(df),
+            x=x_ends,
+            y=[stats["median"]] * len(x_ends),
             mode="lines",
             name=f"Median ({stats['median']:.4f})",
-            line=dict(color="orange", width=2, dash="dot"),
+            line=_MEDIAN_LINE,
         )
     )
 
@@ -272,22 +298,22 @@ def create_plotly_chart(
         if max_limit is not None and not max_limit.isna().all():
             fig.add_trace(
                 go.Scatter(
-                    x=df[VALUE_DATE_COLUMN],
+                    x=x_vals,
                     y=max_limit,
                     mode="lines",
                     name="Max Limit",
-                    line=dict(color="red", width=2, dash="dashdot"),
+                    line=_LIMIT_LINE,
                 )
             )
 
         if min_limit is not None and not min_limit.isna().all():
             fig.add_trace(
                 go.Scatter(
-                    x=df[VALUE_DATE_COLUMN],
+                    x=x_vals,
                     y=min_limit,
                     mode="lines",
                     name="Min Limit",
-                    line=dict(color="red", width=2, dash="dashdot"),
+                    line=_LIMIT_LINE,
                 )
             )
 
@@ -299,7 +325,7 @@ def create_plotly_chart(
                 y=outliers,
                 mode="markers",
                 name="Outliers (±2 SD)",
-                marker=dict(color="red", size=10, symbol="circle-open", line=dict(width=2)),
+                marker=_OUTLIER_MARKER,
             )
         )
 
@@ -311,30 +337,122 @@ def create_plotly_chart(
         padding = (data_max - data_min) * 0.1 if data_max != data_min else abs(data_min) * 0.1
         y_axis_config["range"] = [data_min - padding, data_max + padding]
 
-    fig.update_layout(
-        title=f"{metric_name} Analysis",
-        xaxis_title="Date",
-        yaxis=y_axis_config,
-        hovermode="x unified",
-        template="plotly_white",
-        height=500,
-        showlegend=False,
-    )
+    fig.update_layout(title=f"{metric_name} Analysis", yaxis=y_axis_config, **_BASE_LAYOUT)
 
     return fig
 
 
-def save_and_encode_image(fig: go.Figure, metric_name: str) -> str:
-    """Persist a Plotly figure to PNG and return a base64-encoded string."""
-    filename = f"{metric_name.replace('/', '_')}_chart.png"
-    file_path = os.path.join(OUTPUT_DIR, filename)
-    pio.write_image(fig, file=file_path, format="png", width=1200, height=600, scale=2)
-    logger.info("Saved chart to %s", file_path)
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """Select points with Largest-Triangle-Three-Buckets downsampling.
+    
+    Keeps the first and last points and, from each of ``n_out - 2`` equal-width
+    buckets in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. This preserves
+    the visual shape of a line (peaks, troughs, level shifts) with far fewer
+    points.
+    
+    Args:
+        x: Numeric x values in ascending order.
+        y: Finite y values aligned with ``x``.
+        n_out: Number of points to keep.
+        
+    Returns:
+        Sorted integer indices of the retained points.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over the interior points 1..n-2
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for bucket in range(n_out - 2):
+        lo, hi = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_lo, next_hi = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_lo, next_hi = n - 1, n
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+        area = np.abs(
+            (x[prev] - avg_x) * (y[lo:hi] - y[prev]) - (x[prev] - x[lo:hi]) * (avg_y - y[prev])
+        )
+        prev = lo + int(area.argmax())
+        selected[bucket + 1] = prev
+    return selected
+
 
-    with open(file_path, "rb") as img_file:
-        img_base64 = base64.b64encode(img_file.read()).decode()
+def needs_downsampling(fig: go.Figure, max_points: int) -> bool:
+    """Return True if :func:`downsample_figure` would reduce any trace of ``fig``."""
+    return any(
+        trace.mode == "lines" and trace.y is not None and len(trace.y) > max_points
+        for trace in fig.data
+    )
+
+
+def downsample_figure(fig: go.Figure, max_points: int) -> go.Figure:
+    """Return a copy of ``fig`` with long line traces LTTB-downsampled.
+    
+    Only ``mode="lines"`` traces longer than ``max_points`` are reduced; marker
+    traces such as outliers are kept intact. Points with a non-finite y value
+    are dropped from reduced traces, and x need not be sorted. The input
+    figure is not modified.
+    
+    Args:
+        fig: Figure to downsample.
+        max_points: Maximum number of points kept per line trace.
+        
+    Returns:
+        The downsampled copy, or ``fig`` itself if no trace needed reducing.
+    """
+    if not needs_downsampling(fig, max_points):
+        return fig
+
+    reduced = go.Figure(fig)
+    for trace in reduced.data:
+        if trace.mode != "lines" or trace.x is None or trace.y is None or len(trace.y) <= max_points:
+            continue
+        x_vals = np.asarray(trace.x)
+        try:
+            y_vals = np.asarray(trace.y, dtype=float)
+        except (TypeError, ValueError):
+            continue
+        if x_vals.dtype.kind == "M":
+            x_num = x_vals.astype("datetime64[ns]").astype(np.int64).astype(float)
+        elif x_vals.dtype.kind in "iuf":
+            x_num = x_vals.astype(float)
+        else:
+            x_num = np.arange(len(x_vals), dtype=float)
+
+        valid = np.flatnonzero(np.isfinite(y_vals) & np.isfinite(x_num))
+        # LTTB needs ascending x, but dates may arrive unsorted: bucket the
+        # points in x order, then restore the kept ones to their trace order
+        order = valid[np.argsort(x_num[valid], kind="stable")]
+        keep = np.sort(order[lttb_indices(x_num[order], y_vals[order], max_points)])
+        trace.x = x_vals[keep]
+        trace.y = y_vals[keep]
+    return reduced
+
+
+def save_and_encode_image(fig: go.Figure, metric_name: str, persist: bool = False) -> str:
+    """Render a Plotly figure to PNG and return it base64-encoded.
+    
+    The PNG is rendered in memory; only with ``persist`` is a copy also
+    written to OUTPUT_DIR. It is never read back from disk.
+    """
+    img_bytes = pio.to_image(fig, format="png", width=1200, height=600, scale=2)
+    if persist:
+        filename = f"{metric_name.replace('/', '_')}_chart.png"
+        file_path = os.path.join(OUTPUT_DIR, filename)
+        with open(file_path, "wb") as img_file:
+            img_file.write(img_bytes)
+        logger.info("Saved chart to %s", file_path)
 
-    return img_base64
+    # Encode straight from the PNG buffer; base64 output is pure ASCII
+    return base64.b64encode(memoryview(img_bytes)).decode("ascii")
 
 
 __all__ = [
@@ -343,5 +461,8 @@ __all__ = [
     "calculate_scale_context",
     "create_limit_annotation_html",
     "create_plotly_chart",
+    "downsample_figure",
+    "lttb_indices",
+    "needs_downsampling",
     "save_and_encode_image",
 ]
@@ -0,0 +1,5 @@
+import logging
+
+# Give the app logger a handler before risk_metrics_app.config is imported, so
+# setup_logging() skips its FileHandler and test runs write no log file
+logging.getLogger("risk_metrics_app").addHandler(logging.NullHandler())
@@ -0,0 +1,56 @@
+import asyncio
+import threading
+
+from risk_metrics_app import llm
+
+
+def _loop_threads():
+    return [thread for thread in threading.enumerate() if thread.name == "llm-event-loop"]
+
+
+def test_run_async_task_starts_one_shared_loop_on_demand():
+    async def answer():
+        return 42
+
+    assert llm.run_async_task(answer()) == 42
+    loop = llm._LOOP
+    assert llm.run_async_task(answer()) == 42
+    assert llm._LOOP is loop
+    assert len(_loop_threads()) == 1
+
+
+class _FakeLLM:
+    def __init__(self, reply=None, error=None):
+        self.reply = reply
+        self.error = error
+
+    async def ainvoke(self, messages):
+        if self.error is not None:
+            raise self.error
+        return type("Response", (), {"content": self.reply})()
+
+
+def test_invoke_llm_with_retry_reports_success_and_failure_explicitly():
+    ok = llm.run_async_task(
+        llm.invoke_llm_with_retry(object(), lambda: _FakeLLM(reply="Error generating is fine here"), None)
+    )
+    assert ok == llm.LLMResult("Error generating is fine here", ok=True)
+
+    failed = llm.run_async_task(
+        llm.invoke_llm_with_retry(
+            object(), lambda: _FakeLLM(error=RuntimeError("quota")), None, max_attempts=2, retry_delay=0
+        )
+    )
+    assert not failed.ok
+    assert "quota" in failed.content
+
+
+def test_run_async_task_falls_back_when_background_loop_is_closed(monkeypatch):
+    closed = asyncio.new_event_loop()
+    closed.close()
+    monkeypatch.setattr(llm, "_LOOP", closed)
+
+    async def answer():
+        return 7
+
+    assert llm.run_async_task(answer()) == 7
@@ -0,0 +1,29 @@
+from risk_metrics_app.llm_cache import LLMResponseCache
+
+
+def test_cache_roundtrip_persists_and_counts_hits(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = LLMResponseCache(path)
+    key = LLMResponseCache.make_key("model", "prompt", "image")
+
+    assert cache.get(key) is None
+    cache.put(key, "insight")
+    assert cache.get(key) == "insight"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # A fresh instance on the same file sees the stored response
+    assert LLMResponseCache(path).get(key) == "insight"
+
+
+def test_make_key_separates_parts():
+    assert LLMResponseCache.make_key("ab", "c") != LLMResponseCache.make_key("a", "bc")
+    assert LLMResponseCache.make_key("a", "b") == LLMResponseCache.make_key("a", "b")
+
+
+def test_expired_entries_are_misses(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    key = LLMResponseCache.make_key("model", "prompt")
+    LLMResponseCache(path).put(key, "insight")
+
+    assert LLMResponseCache(path, ttl_seconds=3600).get(key) == "insight"
+    assert LLMResponseCache(path, ttl_seconds=-3600).get(key) is None
@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+
+from risk_metrics_app import metrics
+from risk_metrics_app.metrics import (
+    build_limit_arrays,
+    calculate_statistics,
+    check_limit_breaches,
+    interpolate_for_display,
+)
+
+
+def test_interpolate_for_display_matches_time_interpolation():
+    dates = pd.Series(
+        pd.to_datetime(["2026-01-01", "2026-01-02", "2026-01-04", "2026-01-05", "2026-01-06"])
+    )
+    series = pd.Series([np.nan, 1.0, np.nan, 3.0, np.nan], index=[5, 6, 7, 8, 9], name="var")
+
+    result = interpolate_for_display(series, dates)
+
+    expected = pd.Series(series.values, index=pd.DatetimeIndex(dates)).interpolate(method="time")
+    np.testing.assert_allclose(result.display.to_numpy(), expected.to_numpy())
+    assert list(result.display.index) == [5, 6, 7, 8, 9]
+    assert result.display.name == "var"
+    # Original keeps its gaps for statistics
+    assert result.original.isna().sum() == 3
+
+
+def test_interpolate_for_display_all_nan_stays_nan():
+    dates = pd.Series(pd.to_datetime(["2026-01-01", "2026-01-02"]))
+    series = pd.Series([np.nan, np.nan])
+
+    result = interpolate_for_display(series, dates)
+
+    assert result.display.isna().all()
+
+
+def test_calculate_statistics_matches_pandas_and_flags_outliers():
+    data = pd.Series([10.0, 10.0, np.nan, 10.0, 10.0, 10.0, 100.0], index=list("abcdefg"), name="var")
+
+    stats, outliers = calculate_statistics(data)
+
+    assert stats["count"] == 7
+    assert np.isclose(stats["mean"], data.mean())
+    assert np.isclose(stats["median"], data.median())
+    assert np.isclose(stats["std"], data.std())
+    assert stats["min"] == 10.0
+    assert stats["max"] == 100.0
+    assert outliers.index.tolist() == ["g"]
+    assert outliers.tolist() == [100.0]
+
+
+def test_calculate_statistics_constant_series_has_no_outliers():
+    stats, outliers = calculate_statistics(pd.Series([5.0, 5.0, 5.0]))
+
+    assert stats["std"] == 0
+    assert outliers.empty
+
+
+def _breach_df():
+    return pd.DataFrame(
+        {
+            "valuedate": pd.to_datetime(["2026-01-01", "2026-01-02", "2026-01-03", "2026-01-04"]),
+            "var": [10.0, 60.0, np.nan, -5.0],
+        }
+    )
+
+
+def test_check_limit_breaches_reports_counts_and_dates():
+    df = _breach_df()
+    max_limit = pd.Series([50.0, 50.0, 50.0, 50.0])
+    min_limit = pd.Series([0.0, 0.0, 0.0, np.nan])
+
+    breaches = check_limit_breaches(df, "var", max_limit, min_limit)
+
+    assert breaches == [{"type": "max", "count": 1, "dates": ["2026-01-02"]}]
+
+
+def test_check_limit_breaches_skips_missing_or_non_finite_limits():
+    df = _breach_df()
+
+    assert check_limit_breaches(df, "var") == []
+    assert check_limit_breaches(df, "var", pd.Series([np.nan] * 4), np.inf) == []
+    assert check_limit_breaches(df, "var", min_limit=0.0) == [
+        {"type": "min", "count": 1, "dates": ["2026-01-04"]}
+    ]
+
+
+def test_build_limit_arrays_supports_time_varying_limits():
+    df = _breach_df()
+    df["var_limmaxvalue"] = [50.0, np.nan, 5.0, 5.0]
+    df["other_limminvalue"] = [1.0, 1.0, 1.0, 1.0]
+
+    limit_arrays = build_limit_arrays(df)
+
+    assert set(limit_arrays) == {"var", "other"}
+    var_max, var_min = limit_arrays["var"]
+    assert var_max.tolist() == [50.0, 50.0, 5.0, 5.0]  # forward-filled
+    assert var_min is None
+    assert check_limit_breaches(df, "var", limit_arrays=limit_arrays) == [
+        {"type": "max", "count": 1, "dates": ["2026-01-02"]}
+    ]
+
+
+def test_stats_kernel_matches_numpy_reference():
+    arr = np.array([1.0, 2.0, np.nan, 100.0, 1.0, 1.0, 1.0, 1.0])
+
+    n, mean, std, lo, hi, mask = metrics._stats_and_outliers(arr)
+    ref = metrics._numpy_stats_and_outliers(arr)
+
+    assert n == ref[0]
+    np.testing.assert_allclose([mean, std, lo, hi], ref[1:5])
+    assert mask.tolist() == ref[5].tolist()
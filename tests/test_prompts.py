@@ -0,0 +1,136 @@
+import pandas as pd
+
+from risk_metrics_app.prompts import (
+    SINGLE_METRIC_SYSTEM_PROMPT,
+    create_llm_prompt,
+    create_portfolio_summary_prompt,
+    format_stats,
+)
+
+
+def _stats(mean=1.5):
+    return {"mean": mean, "median": 1.2, "std": 0.3, "min": 0.1, "max": 9.0, "count": 10}
+
+
+def test_create_llm_prompt_formats_outliers_and_breach_dicts():
+    outliers = pd.Series([9.0, 8.5, 8.25, 8.0, 7.5, 7.25], index=[10, 11, 12, 13, 14, 15])
+    breaches = [{"type": "max", "count": 2, "dates": ["2026-01-02", "2026-01-03"]}]
+
+    prompt = create_llm_prompt("VaR", _stats(), outliers, breaches, has_limits=True)
+
+    assert "showing up to 5): 9.0000, 8.5000, 8.2500, 8.0000, 7.5000" in prompt
+    assert "(Total outliers: 6)" in prompt
+    assert "Limit Breaches: Max limit breached 2 times on 2026-01-02, 2026-01-03" in prompt
+
+
+def test_create_portfolio_summary_prompt_includes_each_metric():
+    analyses = [
+        {
+            "metric": "VaR",
+            "stats": _stats(),
+            "outliers": pd.Series([9.0]),
+            "breaches": [{"type": "min", "count": 1, "dates": ["2026-01-04"]}],
+            "insights": "Stable exposure.",
+        },
+        {
+            "metric": "SVaR",
+            "stats": _stats(),
+            "outliers": pd.Series([], dtype=float),
+            "breaches": [],
+            "insights": "No concerns.",
+        },
+    ]
+
+    prompt = create_portfolio_summary_prompt(analyses)
+
+    assert "<name>VaR</name>" in prompt and "<name>SVaR</name>" in prompt
+    assert prompt.count("<outliers>") == 1
+    assert "<breaches>Min limit breached 1 times on 2026-01-04</breaches>" in prompt
+    assert "<range>8.9000</range>" in prompt
+
+
+def test_create_llm_prompt_compact_mode_omits_static_instructions():
+    outliers = pd.Series([], dtype=float)
+
+    full = create_llm_prompt("VaR", _stats(), outliers, [], has_limits=False)
+    compact = create_llm_prompt("VaR", _stats(), outliers, [], has_limits=False, mode="compact")
+
+    assert "ANALYSIS FRAMEWORK" in full
+    assert "ANALYSIS FRAMEWORK" not in compact
+    assert "ANALYSIS FRAMEWORK" in SINGLE_METRIC_SYSTEM_PROMPT
+    assert compact.startswith("Metric: VaR")
+    assert "Mean: 1.5000 | Median: 1.2000" in compact
+    assert len(compact) < len(full) / 3
+
+
+def test_create_portfolio_summary_prompt_escapes_xml_in_free_text():
+    analyses = [
+        {
+            "metric": "P&L",
+            "stats": _stats(),
+            "outliers": pd.Series([], dtype=float),
+            "breaches": ["value <limit & rising>"],
+            "insights": "P&L stayed <5% of limit.",
+        }
+    ]
+
+    prompt = create_portfolio_summary_prompt(analyses)
+
+    assert "<name>P&amp;L</name>" in prompt
+    assert "<breaches>value &lt;limit &amp; rising&gt;</breaches>" in prompt
+    assert "P&amp;L stayed &lt;5% of limit." in prompt
+
+
+def test_format_stats_renders_strings_and_guards_zero_mean():
+    fmt = format_stats(_stats())
+    assert fmt["mean"] == "1.5000"
+    assert fmt["range"] == "8.9000"
+    assert fmt["cv"] == "20.00%"
+
+    assert format_stats(_stats(mean=0.0))["cv"] == "n/a"
+
+
+def test_create_portfolio_summary_prompt_preserves_metric_order():
+    analyses = [
+        {
+            "metric": f"M{idx:02d}",
+            "stats": _stats(),
+            "outliers": pd.Series([], dtype=float),
+            "breaches": [],
+            "insights": f"insight {idx}",
+        }
+        for idx in range(12)
+    ]
+
+    prompt = create_portfolio_summary_prompt(analyses)
+
+    positions = [prompt.index(f"<name>M{idx:02d}</name>") for idx in range(12)]
+    assert positions == sorted(positions)
+    assert prompt.count("<risk_metric>") == 12
+
+
+def test_create_llm_prompt_handles_zero_and_nan_mean():
+    outliers = pd.Series([], dtype=float)
+
+    zero_mean = create_llm_prompt("PnL", _stats(mean=0.0), outliers, [], has_limits=False)
+    nan_mean = create_llm_prompt("PnL", _stats(mean=float("nan")), outliers, [], has_limits=False)
+
+    assert "Coefficient of Variation: n/a" in zero_mean
+    assert "Coefficient of Variation: n/a" in nan_mean
+
+
+def test_create_portfolio_summary_prompt_keeps_placeholder_like_text_verbatim():
+    analyses = [
+        {
+            "metric": "Delta $USD",
+            "stats": _stats(),
+            "outliers": pd.Series([], dtype=float),
+            "breaches": [],
+            "insights": "Exposure of ${mean} {std} $$ noted.",
+        }
+    ]
+
+    prompt = create_portfolio_summary_prompt(analyses)
+
+    assert "<name>Delta $USD</name>" in prompt
+    assert "Exposure of ${mean} {std} $$ noted." in prompt
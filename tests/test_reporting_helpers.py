@@ -1,4 +1,26 @@
-from risk_metrics_app.reporting import metric_status, kpi_counts
+import tempfile
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+import plotly.graph_objects as go
+
+from risk_metrics_app import reporting
+from risk_metrics_app.reporting import (
+    _bounded_map,
+    _sort_metrics_by_priority,
+    _truncate_join,
+    _write_zip_entry,
+    create_batch_export_package,
+    create_batch_png_charts,
+    create_export_package,
+    kpi_counts,
+    make_anchor_id,
+    metric_status,
+    sanitize_node_name,
+)
 
 
 def _analysis(metric, breaches, n_outliers):
@@ -24,3 +46,150 @@ def test_kpi_counts_aggregate():
     ]
     counts = kpi_counts(analyses)
     assert counts == {"total": 4, "breach": 1, "outlier": 1, "ok": 2}
+
+
+def test_make_anchor_id_collapses_separators():
+    assert make_anchor_id("VaR") == "metric-var"
+    assert (
+        make_anchor_id("BasisSensiByCurrencyByPillar[EUR][1W]")
+        == "metric-basissensibycurrencybypillar-eur-1w"
+    )
+    assert make_anchor_id("--P&L / (USD)--") == "metric-p-l-usd"
+
+
+def test_sanitize_node_name_replaces_invalid_path_characters():
+    assert sanitize_node_name("Node/A") == "Node_A"
+    assert sanitize_node_name('a<b>c:d"e\\f|g?h*') == "a_b_c_d_e_f_g_h_"
+    assert sanitize_node_name("   ") == "unnamed_node"
+
+
+def test_write_zip_entry_streams_text_and_bytes():
+    buffer = BytesIO()
+    payload = bytes(range(256)) * 1024
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        _write_zip_entry(zip_file, "summary.txt", "naïve summary")
+        _write_zip_entry(zip_file, "report.html", iter(["<html>", "é", "</html>"]))
+        _write_zip_entry(zip_file, "charts/a_chart.png", payload, compress_type=zipfile.ZIP_STORED)
+
+    with zipfile.ZipFile(buffer) as zip_file:
+        assert zip_file.testzip() is None
+        assert zip_file.read("summary.txt").decode("utf-8") == "naïve summary"
+        assert zip_file.read("report.html").decode("utf-8") == "<html>é</html>"
+        assert zip_file.read("charts/a_chart.png") == payload
+        assert zip_file.getinfo("summary.txt").compress_type == zipfile.ZIP_DEFLATED
+        assert zip_file.getinfo("charts/a_chart.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_write_zip_entry_deflates_streamed_text_at_archive_level():
+    chunks = [f"<tr><td>{i}</td><td>{i * 7919 % 1000:04d}</td></tr>" for i in range(20_000)]
+    text = "".join(chunks).encode("utf-8")
+    level = reporting._ZIP_TEXT_COMPRESSLEVEL
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zip_file:
+        _write_zip_entry(zip_file, "report.html", iter(chunks))
+
+    # Same raw deflate stream zipfile produces at that level
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    expected = compressor.compress(text) + compressor.flush()
+    with zipfile.ZipFile(buffer) as zip_file:
+        assert zip_file.read("report.html") == text
+        assert zip_file.getinfo("report.html").compress_size == len(expected)
+
+
+def test_create_export_package_writes_into_caller_stream():
+    with tempfile.SpooledTemporaryFile(max_size=1024) as spool:
+        result = create_export_package(
+            [], "", "f.csv", False, long_dataset_csv="a,b\n1,2\n", out_stream=spool
+        )
+
+        assert result is spool
+        with zipfile.ZipFile(result) as zip_file:
+            assert zip_file.namelist() == ["risk_analysis_report.html", "powerbi_dataset.csv", "summary.txt"]
+            assert zip_file.read("powerbi_dataset.csv") == b"a,b\n1,2\n"
+
+
+def test_png_figure_jsons_downsample_only_long_traces():
+    long_fig = go.Figure(go.Scatter(x=np.arange(10_000), y=np.sin(np.arange(10_000) / 40.0), mode="lines"))
+    short_fig = go.Figure(go.Scatter(x=[0, 1], y=[1.0, 2.0], mode="lines"))
+    analyses = [{"metric": "long", "fig": long_fig}, {"metric": "short", "fig": short_fig}]
+
+    long_json, short_json = reporting._png_figure_jsons(analyses)
+
+    assert len(long_fig.data[0].y) == 10_000  # source figure untouched
+    assert len(long_json) < len(long_fig.to_json()) / 2
+    assert short_json == short_fig.to_json()
+
+
+def test_fig_json_is_shared_only_for_figures_both_exports_use_unchanged():
+    long_fig = go.Figure(go.Scatter(x=np.arange(10_000), y=np.sin(np.arange(10_000) / 40.0), mode="lines"))
+    short_fig = go.Figure(go.Scatter(x=[0, 1], y=[1.0, 2.0], mode="lines"))
+    analyses = [{"metric": "long", "fig": long_fig}, {"metric": "short", "fig": short_fig}]
+
+    shared = reporting._shared_fig_jsons(analyses)
+    assert shared == {"short": None}
+
+    first = reporting._take_fig_json(short_fig, "short", shared)
+    assert shared == {"short": first}
+    # The second consumer takes the stored JSON and releases it
+    assert reporting._take_fig_json(short_fig, "short", shared) is first
+    assert shared == {}
+
+
+def _chart_analysis(metric):
+    fig = go.Figure(go.Scatter(x=[0, 1, 2], y=[1.0, 3.0, 2.0], mode="lines"))
+    return {
+        "metric": metric,
+        "fig": fig,
+        "stats": {"mean": 2.0, "median": 2.0, "std": 1.0, "min": 1.0, "max": 3.0},
+        "outliers": [],
+        "breaches": [],
+        "insights": "",
+        "scale_context": None,
+    }
+
+
+def test_batch_export_renders_pngs_only_on_request(monkeypatch):
+    monkeypatch.setattr(reporting.pio, "to_image", lambda fig, **options: b"png")
+    batch = {"Desk/A": [_chart_analysis("VaR")]}
+
+    with zipfile.ZipFile(create_batch_export_package(batch, {}, "f.csv", False)) as zip_file:
+        assert zip_file.namelist() == ["Desk_A/report.html", "Desk_A/summary.txt"]
+
+    with zipfile.ZipFile(
+        create_batch_export_package(batch, {}, "f.csv", False, include_png_charts=True)
+    ) as zip_file:
+        assert zip_file.read("Desk_A/charts/VaR_chart.png") == b"png"
+
+    with zipfile.ZipFile(create_batch_png_charts(batch)) as zip_file:
+        assert zip_file.namelist() == ["Desk_A/charts/VaR_chart.png"]
+        assert zip_file.getinfo("Desk_A/charts/VaR_chart.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_bounded_map_keeps_order_and_limits_inputs_in_flight():
+    taken = []
+
+    def items():
+        for i in range(10):
+            taken.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = _bounded_map(executor, lambda x: x * x, items(), window=3)
+        assert next(results) == 0
+        # One result consumed: the initial window plus one replacement
+        assert len(taken) == 4
+        assert list(results) == [i * i for i in range(1, 10)]
+
+
+def test_truncate_join_marks_cut_lists():
+    assert _truncate_join(["a", "b"]) == ("a, b", "")
+    assert _truncate_join([str(i) for i in range(12)], limit=3) == ("0, 1, 2", "…")
+
+
+def test_sort_metrics_by_priority_puts_priority_metrics_first():
+    names = ["Delta[EUR][1Y]", "stthh", "alpha", "VaR", "Delta", "SVaR", "Delta[EUR][3M]"]
+
+    ordered = [a["metric"] for a in _sort_metrics_by_priority([{"metric": n} for n in names])]
+
+    assert ordered[:3] == ["VaR", "SVaR", "stthh"]
+    assert ordered[3:] == ["alpha", "Delta", "Delta[EUR][3M]", "Delta[EUR][1Y]"]
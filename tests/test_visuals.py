@@ -0,0 +1,132 @@
+import base64
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from risk_metrics_app import visuals
+from risk_metrics_app.visuals import (
+    LimitPeriod,
+    ScaleContext,
+    _build_limit_periods,
+    create_limit_annotation_html,
+    create_plotly_chart,
+    downsample_figure,
+    lttb_indices,
+    save_and_encode_image,
+)
+
+
+def test_lttb_indices_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=float)
+    y = np.zeros(1000)
+    y[437] = 50.0
+    y[801] = -20.0
+
+    idx = lttb_indices(x, y, 50)
+
+    assert len(idx) == 50
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    assert {437, 801} <= set(idx.tolist())
+
+
+def test_lttb_indices_returns_all_points_below_threshold():
+    assert lttb_indices(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_figure_reduces_line_traces_only():
+    dates = pd.Series(pd.date_range("2020-01-01", periods=5000, freq="D"))
+    values = pd.Series(np.sin(np.arange(5000) / 50.0))
+    values.iloc[:3] = np.nan
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=dates, y=values, mode="lines"))
+    fig.add_trace(go.Scatter(x=dates[:10], y=values[:10], mode="markers"))
+
+    reduced = downsample_figure(fig, 500)
+
+    assert len(reduced.data[0].y) == 500
+    assert np.isfinite(reduced.data[0].y).all()
+    assert reduced.data[0].x[-1] == fig.data[0].x[-1]
+    assert len(reduced.data[1].y) == 10
+    assert len(fig.data[0].y) == 5000  # original untouched
+    assert downsample_figure(fig, 10_000) is fig
+
+
+def test_downsample_figure_handles_unsorted_dates():
+    dates = pd.date_range("2020-01-01", periods=5000, freq="D")
+    values = np.sin(np.arange(5000) / 50.0)
+    values[1234] = 40.0
+    shuffled = np.random.default_rng(0).permutation(5000)
+    fig = go.Figure(go.Scatter(x=dates[shuffled], y=values[shuffled], mode="lines"))
+    sorted_fig = go.Figure(go.Scatter(x=dates, y=values, mode="lines"))
+
+    reduced = downsample_figure(fig, 500).data[0]
+
+    assert len(reduced.y) == 500
+    assert 40.0 in reduced.y
+    # Same points as for the sorted series, kept in the trace's own order
+    assert set(reduced.x) == set(downsample_figure(sorted_fig, 500).data[0].x)
+    positions = pd.Index(dates[shuffled]).get_indexer(reduced.x)
+    assert np.all(np.diff(positions) > 0)
+
+
+def test_build_limit_periods_groups_runs_and_skips_unlimited_spans():
+    dates = pd.Series(pd.date_range("2026-01-01", periods=7, freq="D"))
+    max_limit = pd.Series([10.0, 10.0, np.nan, np.nan, 20.0, 20.0, 20.0])
+    min_limit = pd.Series([0.0, 0.0, np.nan, np.nan, np.nan, 1.0, 1.0])
+
+    periods = _build_limit_periods(dates.to_numpy(), max_limit, min_limit)
+
+    assert [(p.start_date.day, p.end_date.day, p.max_limit, p.min_limit) for p in periods] == [
+        (1, 2, 10.0, 0.0),
+        (5, 5, 20.0, None),
+        (6, 7, 20.0, 1.0),
+    ]
+    assert _build_limit_periods(dates.to_numpy(), None, None) == []
+
+
+def test_create_plotly_chart_draws_mean_and_median_from_endpoints():
+    dates = pd.date_range("2026-01-01", periods=100, freq="D")
+    df = pd.DataFrame({
+        "valuedate": dates[::-1],  # unsorted input
+        "var": np.arange(100, dtype=float),
+    })
+    stats = {"mean": 49.5, "median": 49.5}
+
+    fig = create_plotly_chart(df, "var", stats, pd.Series(dtype=float))
+
+    data_trace, mean_trace, median_trace = fig.data
+    assert len(data_trace.y) == 100
+    assert list(mean_trace.y) == [49.5, 49.5]
+    assert list(mean_trace.x) == [dates[0], dates[-1]]
+    assert len(median_trace.x) == 2
+
+
+def test_save_and_encode_image_renders_in_memory(monkeypatch, tmp_path):
+    monkeypatch.setattr(visuals.pio, "to_image", lambda fig, **options: b"\x89PNG-bytes")
+    monkeypatch.setattr(visuals, "OUTPUT_DIR", str(tmp_path))
+
+    encoded = save_and_encode_image(go.Figure(), "a/b")
+
+    assert base64.b64decode(encoded) == b"\x89PNG-bytes"
+    assert list(tmp_path.iterdir()) == []
+
+    save_and_encode_image(go.Figure(), "a/b", persist=True)
+    assert (tmp_path / "a_b_chart.png").read_bytes() == b"\x89PNG-bytes"
+
+
+def test_create_limit_annotation_html_lists_each_period():
+    periods = [
+        LimitPeriod(pd.Timestamp("2026-01-01"), pd.Timestamp("2026-01-31"), 1500.0, -250.5),
+        LimitPeriod(pd.Timestamp("2026-02-01"), pd.Timestamp("2026-02-28"), None, -300.0),
+    ]
+    context = ScaleContext(needs_adaptive_scaling=True, limit_periods=periods, scale_ratio=0.042)
+
+    html = create_limit_annotation_html(context)
+
+    assert "less than 4.2% of the limit range" in html
+    assert "<li><strong>2026-01-01 to 2026-01-31:</strong> Max: 1,500.00 | Min: -250.50</li>" in html
+    assert "<li><strong>2026-02-01 to 2026-02-28:</strong> Min: -300.00</li>" in html
+    assert "consumption" not in create_limit_annotation_html(context, has_breaches=True)
+    assert create_limit_annotation_html(ScaleContext()) == ""